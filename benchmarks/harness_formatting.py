@@ -0,0 +1,76 @@
+"""Micro-benchmark of the per-test cost of formatting execution harnesses.
+
+Compares building each harness from scratch for every test, as the formatters used to,
+with filling the cached per-question templates. Run from the repository root:
+
+    python -m benchmarks.harness_formatting [--size 100000] [--repeat 200]
+"""
+import argparse
+import json
+import timeit
+from website import code_execution
+
+PYTHON_CODE = "class Solution:\n    def sumArray(self, arr):\n        return sum(arr)\n"
+JAVASCRIPT_CODE = "function sumArray(arr) {\n    return arr.reduce((a, b) => a + b, 0);\n}\n"
+GO_CODE = ("func sumArray(arr []int) int {\n    total := 0\n    for _, v := range arr {\n"
+           "        total += v\n    }\n    return total\n}\n")
+
+def rebuild_each_time(template_builder, parse_input=False):
+    """Returns a formatter that rebuilds the template on every call, like the old formatters."""
+    build = template_builder.__wrapped__
+
+    def format_uncached(code, values, test_input):
+        if parse_input:
+            # The old JavaScript formatter parsed every input to pick its call pattern
+            json.loads(test_input)
+        return code_execution.fill_slots(build("sumArray"), (code, *values))
+    return format_uncached
+
+def bench(label, before, after, repeat):
+    """Times both formatters and prints their mean cost per test in microseconds."""
+    before_time = timeit.timeit(before, number=repeat) / repeat * 1e6
+    after_time = timeit.timeit(after, number=repeat) / repeat * 1e6
+    print(f"{label:<22}{before_time:>12.1f}{after_time:>12.1f}{before_time / after_time:>9.2f}x")
+
+def main():
+    """Prints the per-test formatting cost of each language for a small and a large input."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000, help="integers in each test input")
+    parser.add_argument("--repeat", type=int, default=200, help="formatting calls timed per case")
+    args = parser.parse_args()
+
+    print("Per-test formatting cost in microseconds")
+    for size in (10, args.size):
+        test_input = json.dumps(list(range(size)))
+        go_values = code_execution.build_go_test_call(test_input, "sumArray", False)
+        print(f"\n{f'{size} integer input':<22}{'rebuilt':>12}{'cached':>12}{'speedup':>9}")
+
+        # Each lambda binds this size's values as default arguments, not as loop variables
+        python_before = rebuild_each_time(code_execution.python_template)
+        bench("python",
+              lambda before=python_before, test_input=test_input:
+              before(PYTHON_CODE, (test_input,), test_input),
+              lambda test_input=test_input:
+              code_execution.format_python(PYTHON_CODE, test_input, "sumArray"),
+              args.repeat)
+
+        javascript_before = rebuild_each_time(code_execution.javascript_template, parse_input=True)
+        bench("javascript",
+              lambda before=javascript_before, test_input=test_input:
+              before(JAVASCRIPT_CODE, (json.dumps(test_input),), test_input),
+              lambda test_input=test_input:
+              code_execution.format_javascript(JAVASCRIPT_CODE, test_input, "sumArray"),
+              args.repeat)
+
+        # Go literals are generated from each input either way, so only the skeleton is compared
+        go_before = rebuild_each_time(code_execution.go_template)
+        bench("go (skeleton only)",
+              lambda before=go_before, go_values=go_values, test_input=test_input:
+              before(GO_CODE, go_values, test_input),
+              lambda go_values=go_values:
+              code_execution.fill_slots(code_execution.go_template("sumArray"),
+                                        (GO_CODE, *go_values)),
+              args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark of stripping TypeScript syntax from large submissions.
+
+Compares the original pass, which compiled its patterns inline and could rescan long runs
+of whitespace, digits and identifier characters once per character, with the precompiled
+strip_typescript, and checks both produce the same JavaScript. Cached conversions are
+timed too. Run from the repository root:
+
+    python -m benchmarks.typescript_stripping [--functions 2000] [--run 20000] [--repeat 5]
+"""
+import argparse
+import re
+import timeit
+from website import code_execution
+
+def strip_typescript_inline(code):
+    """The original stripping pass, kept here as the baseline."""
+    code = re.sub(r'/\*\*[\s\S]*?\*/', '', code)
+    code = re.sub(r'<\s*[A-Za-z0-9_$,\s]*?>', '', code)
+    code = re.sub(
+        r'function\s+([A-Za-z0-9_$]+)\s*\(\s*([^)]*?)\s*\)\s*:\s*[^{]+\{',
+        lambda m: f'function {m.group(1)}({code_execution.strip_param_types(m.group(2))}) {{',
+        code
+    )
+    code = re.sub(
+        r'(\s+)([A-Za-z0-9_$]+)\s*\(\s*([^)]*?)\s*\)\s*:\s*[^{]+\{',
+        lambda m: f'{m.group(1)}{m.group(2)}({code_execution.strip_param_types(m.group(3))}) {{',
+        code
+    )
+    code = re.sub(r'(const|let|var)\s+([A-Za-z0-9_$]+)\s*:\s*[^=;]+;', r'\1 \2;', code)
+    code = re.sub(r'(const|let|var)\s+([A-Za-z0-9_$]+)\s*:\s*[^=;]+?(\s*=)', r'\1 \2\3', code)
+    code = re.sub(r'(\d+)n', r'BigInt(\1)', code)
+    code = re.sub(r'\s+as\s+[A-Za-z0-9_$<>\[\],\s|&{}]+', '', code)
+    code = re.sub(r'([A-Za-z0-9_$\.\(\)\[\]]+)!', r'\1', code)
+    return code
+
+def typical_submission(functions):
+    """A large but ordinary TypeScript file of annotated functions and classes."""
+    block = """
+/** Adds up {index} numbers */
+function sum{index}(nums: number[], start: number): number {{
+    let total: number = start;
+    const seen: Map<number, boolean> = new Map<number, boolean>();
+    for (const n of nums) {{
+        total += n;
+        seen.set(n, true);
+    }}
+    const big = 123456789n;
+    return (total as number) + seen.size + Number(big);
+}}
+
+class Solver{index} {{
+    private cache: Map<string, number[]>;
+    solve(input: number[]): number[] {{
+        const result = this.cache.get(input.join(','))!;
+        return result ?? input;
+    }}
+}}
+"""
+    return "".join(block.format(index=index) for index in range(functions))
+
+def long_runs(length):
+    """Long runs of whitespace, digits and identifier characters that never match."""
+    return ("function f(x: number): number {\n"
+            + " " * length + "return x;\n"
+            + "const digits = " + "7" * length + ";\n"
+            + "const chain = " + "a." * (length // 2) + "b;\n}\n")
+
+def bench(label, code, repeat):
+    """Checks both passes agree, then prints their mean time in milliseconds."""
+    uncached = code_execution.strip_typescript.__wrapped__
+    assert strip_typescript_inline(code) == uncached(code), f"{label}: outputs differ"
+
+    before = timeit.timeit(lambda: strip_typescript_inline(code), number=repeat) / repeat * 1e3
+    after = timeit.timeit(lambda: uncached(code), number=repeat) / repeat * 1e3
+    code_execution.strip_typescript(code)
+    cached = timeit.timeit(lambda: code_execution.strip_typescript(code), number=repeat) / repeat * 1e3
+    print(f"{label:<26}{len(code):>10}{before:>12.2f}{after:>12.2f}{cached:>12.4f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--functions", type=int, default=2000, help="functions in the typical file")
+    parser.add_argument("--run", type=int, default=20000, help="length of each pathological run")
+    parser.add_argument("--repeat", type=int, default=5, help="conversions timed per case")
+    args = parser.parse_args()
+
+    print("Mean time to strip one submission in milliseconds")
+    print(f"{'input':<26}{'chars':>10}{'inline':>12}{'compiled':>12}{'cached':>12}")
+    bench("typical submission", typical_submission(args.functions), args.repeat)
+    bench("long unmatched runs", long_runs(args.run), args.repeat)
+
+if __name__ == "__main__":
+    main()
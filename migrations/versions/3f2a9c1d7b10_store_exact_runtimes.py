@@ -0,0 +1,67 @@
+"""Store exact submission runtimes
+
+Submission.runtime and UserQuestionProgress.bestRuntime held runtimes rounded to whole
+milliseconds, so sub-millisecond runs were stored as 0 and ranked against the wrong
+histogram bucket. Both become floats. Runtimes already saved are restored from the
+submission jobs that produced them, and best runtimes are recomputed from those.
+
+Tables are created by db.create_all() when the app starts, so this only changes
+databases created before the columns were floats.
+
+Revision ID: 3f2a9c1d7b10
+Revises:
+Create Date: 2026-10-18 10:12:00.000000
+
+"""
+# pylint: disable=invalid-name,no-member
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+submission = sa.table('submission', sa.column('submissionID'), sa.column('userID'),
+                      sa.column('questionID'), sa.column('result'), sa.column('runtime'))
+submission_job = sa.table('submission_job', sa.column('submissionID'), sa.column('runtime'))
+progress = sa.table('user_question_progress', sa.column('userID'), sa.column('questionID'),
+                    sa.column('passed'), sa.column('bestRuntime'))
+
+
+def upgrade():
+    """Makes runtimes floats and restores the exact runtimes of saved submissions."""
+    with op.batch_alter_table('submission') as batch_op:
+        batch_op.alter_column('runtime', existing_type=sa.Integer(), type_=sa.Float(),
+                              existing_nullable=True)
+    with op.batch_alter_table('user_question_progress') as batch_op:
+        batch_op.alter_column('bestRuntime', existing_type=sa.Integer(), type_=sa.Float(),
+                              existing_nullable=True)
+
+    job_runtime = (sa.select(submission_job.c.runtime)
+                   .where(submission_job.c.submissionID == submission.c.submissionID)
+                   .where(submission_job.c.runtime.isnot(None)))
+    op.execute(submission.update()
+               .where(job_runtime.exists())
+               .values(runtime=job_runtime.scalar_subquery()))
+
+    best_runtime = (sa.select(sa.func.min(submission.c.runtime))
+                    .where(submission.c.userID == progress.c.userID)
+                    .where(submission.c.questionID == progress.c.questionID)
+                    .where(submission.c.result == 'Passed')
+                    .scalar_subquery())
+    op.execute(progress.update()
+               .where(progress.c.passed == sa.true())
+               .values(bestRuntime=best_runtime))
+
+
+def downgrade():
+    """Makes runtimes whole milliseconds again."""
+    with op.batch_alter_table('user_question_progress') as batch_op:
+        batch_op.alter_column('bestRuntime', existing_type=sa.Float(), type_=sa.Integer(),
+                              existing_nullable=True)
+    with op.batch_alter_table('submission') as batch_op:
+        batch_op.alter_column('runtime', existing_type=sa.Float(), type_=sa.Integer(),
+                              existing_nullable=True)
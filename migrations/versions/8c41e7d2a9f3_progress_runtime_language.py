@@ -0,0 +1,79 @@
+"""Track best runtime language and latest pass in question progress
+
+UserQuestionProgress gains the language of the fastest passing runtime and the ID of
+the latest passing submission, so runtime ranks and the latest pass are read from
+progress rows instead of by scanning submissions. Every progress row is then rebuilt
+from the saved submissions, which also fills in databases created before progress rows
+were kept.
+
+Revision ID: 8c41e7d2a9f3
+Revises: 3f2a9c1d7b10
+Create Date: 2026-10-18 11:40:00.000000
+
+"""
+# pylint: disable=invalid-name,no-member
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41e7d2a9f3'
+down_revision = '3f2a9c1d7b10'
+branch_labels = None
+depends_on = None
+
+submission = sa.table('submission', sa.column('submissionID'), sa.column('userID'),
+                      sa.column('questionID'), sa.column('result'), sa.column('runtime'),
+                      sa.column('language'), sa.column('time'))
+progress = sa.table('user_question_progress', sa.column('userID'), sa.column('questionID'),
+                    sa.column('passed'), sa.column('attempts'), sa.column('firstPassedAt'),
+                    sa.column('bestRuntime'), sa.column('bestRuntimeLanguage'),
+                    sa.column('lastPassedSubmissionID'))
+
+
+def upgrade():
+    """Adds the columns, unless db.create_all() already has, and rebuilds progress."""
+    columns = {column['name'] for column in
+               sa.inspect(op.get_bind()).get_columns('user_question_progress')}
+    with op.batch_alter_table('user_question_progress') as batch_op:
+        if 'bestRuntimeLanguage' not in columns:
+            batch_op.add_column(sa.Column('bestRuntimeLanguage', sa.String(50), nullable=True))
+        if 'lastPassedSubmissionID' not in columns:
+            batch_op.add_column(sa.Column('lastPassedSubmissionID', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_user_question_progress_last_passed', 'submission',
+                                        ['lastPassedSubmissionID'], ['submissionID'])
+
+    passed = submission.c.result == 'Passed'
+    op.execute(progress.delete())
+    op.execute(progress.insert().from_select(
+        ['userID', 'questionID', 'attempts', 'passed', 'firstPassedAt', 'bestRuntime',
+         'lastPassedSubmissionID'],
+        sa.select(
+            submission.c.userID,
+            submission.c.questionID,
+            sa.func.count(submission.c.submissionID),
+            sa.func.max(sa.case((passed, 1), else_=0)),
+            sa.func.min(sa.case((passed, submission.c.time))),
+            sa.func.min(sa.case((passed, submission.c.runtime))),
+            sa.func.max(sa.case((passed, submission.c.submissionID)))
+        ).group_by(submission.c.userID, submission.c.questionID)))
+
+    best_language = (sa.select(submission.c.language)
+                     .where(submission.c.userID == progress.c.userID)
+                     .where(submission.c.questionID == progress.c.questionID)
+                     .where(passed)
+                     .where(submission.c.runtime == progress.c.bestRuntime)
+                     .order_by(submission.c.submissionID)
+                     .limit(1)
+                     .scalar_subquery())
+    op.execute(progress.update()
+               .where(progress.c.bestRuntime.isnot(None))
+               .values(bestRuntimeLanguage=best_language))
+
+
+def downgrade():
+    """Drops the columns."""
+    with op.batch_alter_table('user_question_progress') as batch_op:
+        batch_op.drop_constraint('fk_user_question_progress_last_passed', type_='foreignkey')
+        batch_op.drop_column('lastPassedSubmissionID')
+        batch_op.drop_column('bestRuntimeLanguage')
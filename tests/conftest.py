@@ -3,6 +3,11 @@ import pytest
 from datetime import datetime
 from werkzeug.security import generate_password_hash
 from website import create_app, db
+from website.code_execution import (reset_admission_controller, reset_executor_client,
+                                    reset_execution_cache, reset_go_binary_cache,
+                                    reset_metrics_registry)
+from website.ai_helper import reset_analysis_cache
+from website.progress import backfill_progress
 from website.models import User, Tag, Question, QuestionTag, TestCase, MasteryScore, Submission, ABTestAnalytics
 
 @pytest.fixture
@@ -22,6 +27,23 @@ def app():
         db.session.remove()
         db.drop_all()
 
+@pytest.fixture(autouse=True)
+def fresh_execution_state():
+    """Give every test its own executor client and caches so their state does not leak."""
+    reset_executor_client()
+    reset_execution_cache()
+    reset_go_binary_cache()
+    reset_admission_controller()
+    reset_metrics_registry()
+    reset_analysis_cache()
+    yield
+    reset_executor_client()
+    reset_execution_cache()
+    reset_go_binary_cache()
+    reset_admission_controller()
+    reset_metrics_registry()
+    reset_analysis_cache()
+
 @pytest.fixture
 def client(app):
     """Create a test client for the app."""
@@ -93,6 +115,8 @@ def sample_data(client, app):
             time=datetime.utcnow()
         )
         db.session.add(submission1)
+        # Submissions added directly need their progress rows, as after a backfill
+        backfill_progress()
         db.session.commit()
 
         entry1 = ABTestAnalytics(
@@ -101,3 +101,25 @@ def test_analyze_missing_desc_error(client, app):
             response_json = json.loads(response.data)
             assert response_json["success"] is False
             assert response_json["error"] == "Missing question description or code"
+
+def test_analyze_reuses_analysis_of_cosmetically_equal_code(client, app):
+    """Test the /analyze_submission endpoint only asks the model once for reformatted code."""
+    analysis = '{"user_time_complexity": "O(n)", "user_space_complexity": "O(1)"}'
+    with app.app_context():
+        with mock.patch('website.ai_helper.generate_response') as mock_generate_response:
+            mock_generate_response.return_value = (analysis, None)
+
+            first = client.post('/analyze_submission', json={
+                "question_description": "test description",
+                "code": "def f(nums):\n    return sum(nums)",
+                "language": "python"
+            })
+            second = client.post('/analyze_submission', json={
+                "question_description": "test description",
+                "code": "def f(nums):  # total\n\n    return   sum(nums)\n",
+                "language": "python"
+            })
+
+            assert mock_generate_response.call_count == 1
+            assert second.get_json() == first.get_json()
+            assert second.get_json()["analysis"]["timeComplexity"] == "O(n)"
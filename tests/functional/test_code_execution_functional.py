@@ -1,19 +1,37 @@
 # test_code_execution_unit.py
 
 import pytest
+import gzip
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 
 from website.code_execution import (
     execute_code_with_test,
+    execute_code_with_tests,
+    execute_code_concurrently,
     run_tests,
+    summarize_performance,
     format_python,
+    format_python_batch,
     format_javascript,
+    format_javascript_batch,
     execute_typescript_as_javascript,
+    strip_typescript,
     format_go,
+    format_go_batch,
+    format_go_program,
+    format_go_program_input,
+    javascript_template,
     is_linked_list_question,
-    run_code_samples
+    run_code_samples,
+    get_admission_controller
 )
+from website.extensions import db
+from website.models import Submission, SubmissionJob, TestCase
 from collections import namedtuple
 
 TestCaseStub = namedtuple("TestCaseStub", ["inputData", "expectedOutput", "isSample"])
@@ -21,10 +39,10 @@ TestCaseStub = namedtuple("TestCaseStub", ["inputData", "expectedOutput", "isSam
 @pytest.fixture
 def mock_requests_post():
     """
-    A pytest fixture that patches requests.post and returns a mock object.
+    A pytest fixture that patches the executor client's session post and returns a mock object.
     You can control the .json() return value and the .status_code, etc.
     """
-    with patch("website.code_execution.requests.post") as mock_post:
+    with patch("website.executor.requests.Session.post") as mock_post:
         yield mock_post
 
 def test_execute_code_with_test_python_success(mock_requests_post):
@@ -170,12 +188,11 @@ def test_run_tests_all_passed():
     Tests run_tests when all test cases pass.
     """
     code = "class Solution:\n    def sumArray(self, arr):\n        return sum(arr)"
-    with patch("website.code_execution.execute_code_with_test") as mock_exec:
-        mock_exec.return_value = {
-            "output": 6, 
-            "stdout": [], 
-            "stderr": []
-        }
+    with patch("website.code_execution.execute_code_with_tests") as mock_exec:
+        mock_exec.return_value = [
+            {"output": 6, "stdout": [], "stderr": []},
+            {"output": 6, "stdout": [], "stderr": []}
+        ]
         test_cases = [
             TestCaseStub("[1, 2, 3]", "6", True),
             TestCaseStub("[4, 2]", "6", False)
@@ -192,13 +209,13 @@ def test_run_tests_some_failed():
     """
     code = "class Solution:\n    def sumArray(self, arr):\n        return sum(arr)"
     def side_effect(*args, **kwargs):
-        input_data = args[1]
-        if input_data == "[1, 2, 3]":
-            return {"output": 6, "stdout": [], "stderr": []}
-        else:
-            return {"output": 100, "stdout": [], "stderr": []}
+        return [
+            {"output": 6, "stdout": [], "stderr": []} if input_data == "[1, 2, 3]"
+            else {"output": 100, "stdout": [], "stderr": []}
+            for input_data in args[1]
+        ]
 
-    with patch("website.code_execution.execute_code_with_test", side_effect=side_effect):
+    with patch("website.code_execution.execute_code_with_tests", side_effect=side_effect):
         test_cases = [
             TestCaseStub("[1, 2, 3]", "6", True),
             TestCaseStub("[4, 5]", "9", False)
@@ -220,12 +237,12 @@ def test_run_tests_with_non_json_expected():
         TestCaseStub("[1, 2, 3]", "hello", True)
     ]
     
-    with patch("website.code_execution.execute_code_with_test") as mock_exec:
-        mock_exec.return_value = {
+    with patch("website.code_execution.execute_code_with_tests") as mock_exec:
+        mock_exec.return_value = [{
             "output": "hello",
             "stdout": [],
             "stderr": []
-        }
+        }]
         
         results, all_passed = run_tests(code, test_cases, "addTwoNumbers", "python")
     
@@ -591,4 +608,484 @@ def test_format_go_null_input():
     """
     formatted = format_go(code, None, "handleNull")
     assert "var input interface{}" in formatted
-    assert "result := handleNull(input)" in formatted
\ No newline at end of file
+    assert "result := handleNull(input)" in formatted
+
+def test_execute_code_with_tests_single_request(mock_requests_post):
+    """Tests that a batch of test inputs is executed with one executor call."""
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {
+        "output": json.dumps([
+            {"result": 6, "stdout": "first\n", "stderr": "", "runtime": 0.25, "memory": 9000},
+            {"result": None, "stdout": "", "stderr": "ValueError: bad input", "runtime": None, "memory": 9100}
+        ])
+    }
+    mock_requests_post.return_value = mock_response
+
+    code = "class Solution:\n    def sumArray(self, arr):\n        return sum(arr)"
+    results = execute_code_with_tests(code, ["[1, 2, 3]", "[4, 5]"], "sumArray", "python")
+
+    assert mock_requests_post.call_count == 1
+    assert results[0] == {"output": 6, "stdout": ["first"], "stderr": None, "runtime": 0.25, "memory": 9000}
+    assert results[1] == {"output": None, "stdout": None, "stderr": ["ValueError: bad input"],
+                          "runtime": None, "memory": 9100}
+
+def test_typescript_is_stripped_once_per_submission(app, mock_requests_post):
+    """Tests every test of a TypeScript suite reuses one conversion of the submission."""
+    app.config["CODE_EXECUTION_MODE"] = "concurrent"
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"output": json.dumps({"result": 1})}
+    mock_requests_post.return_value = mock_response
+
+    strip_typescript.cache_clear()
+    code = "function sumArray(arr: number[]): number {\n    return arr.length as number;\n}"
+    execute_code_concurrently(code, ["[1]", "[2]", "[3]"], "sumArray", "typescript")
+    execute_code_with_tests(code + "\n", ["[4]"], "sumArray", "typescript")
+
+    info = strip_typescript.cache_info()
+    assert (info.misses, info.hits) == (2, 2)
+
+def test_stdin_channel_keeps_program_size_constant(app, mock_requests_post):
+    """Tests inputs sent on stdin are left out of the program, whatever their size."""
+    app.config["CODE_EXECUTION_INPUT_CHANNEL"] = "stdin"
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"output": json.dumps([{"result": 6}])}
+    mock_requests_post.return_value = mock_response
+
+    code = "class Solution:\n    def sumArray(self, arr):\n        return sum(arr)"
+    large_input = json.dumps(list(range(100000)))
+    execute_code_with_tests(code, ["[1, 2, 3]"], "sumArray", "python")
+    execute_code_with_tests(code, [large_input], "sumArray", "python")
+
+    small, large = [call.kwargs["json"] for call in mock_requests_post.call_args_list]
+    assert small["code"] == large["code"]
+    assert json.loads(large["stdin"]) == [large_input]
+
+def test_suite_payload_sends_code_once_compressed(app, mock_requests_post):
+    """Tests the suite format posts one gzipped request holding the program once and each input."""
+    app.config["CODE_EXECUTOR_PAYLOAD_FORMAT"] = "suite"
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"outputs": [
+        {"output": json.dumps({"result": 6, "runtime": 0.5, "memory": 9000}), "error": None},
+        {"output": None, "error": "Time limit exceeded after 5 seconds"}
+    ]}
+    mock_requests_post.return_value = mock_response
+
+    code = "class Solution:\n    def sumArray(self, arr):\n        return sum(arr)"
+    results = execute_code_with_tests(code, ["[1, 2, 3]", "[4]"], "sumArray", "python")
+
+    mock_requests_post.assert_called_once()
+    call = mock_requests_post.call_args
+    assert call.kwargs["headers"]["Content-Encoding"] == "gzip"
+    payload = json.loads(gzip.decompress(call.kwargs["data"]))
+    assert payload["code"].count("def sumArray") == 1
+    assert payload["inputs"] == ["[1, 2, 3]", "[4]"]
+    assert results[0]["output"] == 6
+    assert results[1]["stderr"] == ["Time limit exceeded after 5 seconds"]
+
+def test_execute_code_with_tests_compile_error(mock_requests_post):
+    """Tests that output which is not a JSON array is reported for every test."""
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"output": "SyntaxError: invalid syntax"}
+    mock_requests_post.return_value = mock_response
+
+    results = execute_code_with_tests("class Solution:", ["1", "2"], "foo", "python")
+
+    assert len(results) == 2
+    assert all(r["stderr"] == ["SyntaxError: invalid syntax"] for r in results)
+    assert all(r["output"] is None for r in results)
+
+def test_execute_code_with_tests_empty(mock_requests_post):
+    """Tests that an empty suite never calls the executor."""
+    assert execute_code_with_tests("code", [], "foo", "python") == []
+    mock_requests_post.assert_not_called()
+
+def test_run_tests_single_executor_call():
+    """Tests that run_tests runs every test case through one batched call."""
+    with patch("website.code_execution.execute_code_with_tests") as mock_exec:
+        mock_exec.return_value = [{"output": 6, "stdout": None, "stderr": None}] * 3
+        test_cases = [TestCaseStub("[1, 2, 3]", "6", True)] * 3
+        results, all_passed = run_tests("code", test_cases, "sumArray", "python")
+
+    mock_exec.assert_called_once_with("code", ["[1, 2, 3]"] * 3, "sumArray", "python")
+    assert all_passed is True
+    assert len(results) == 3
+
+def test_format_python_batch():
+    """Tests format_python_batch embeds every input and emits a list of results."""
+    code = "class Solution:\n    def foo(self, x): return x"
+    formatted = format_python_batch(code, ["123", "[4, 5]"], "foo")
+    assert "    123,\n    [4, 5],\n" in formatted
+    assert "for input_data in test_inputs:" in formatted
+    assert "print(json.dumps(results))" in formatted
+    assert "list_to_linked_list" not in formatted
+
+def test_format_javascript_batch():
+    """Tests format_javascript_batch embeds every input as a JSON string."""
+    code = "function foo(x){ return x + 1; }"
+    formatted = format_javascript_batch(code, ["5", "6"], "foo")
+    assert code in formatted
+    assert 'const rawInputs = ["5", "6"];' in formatted
+    assert "console.log(JSON.stringify(results));" in formatted
+
+def test_format_go_batch():
+    """Tests format_go_batch declares each input inside its own test closure."""
+    code = "func foo(arr []int) int { return len(arr) }"
+    formatted = format_go_batch(code, ["[1,2,3]", "[4]"], "foo")
+    assert "input := []int{1, 2, 3}" in formatted
+    assert "input := []int{4}" in formatted
+    assert formatted.count("devreadyCaptureStdout(func()") == 2
+    assert "json.Marshal(results)" in formatted
+
+def test_harness_templates_are_built_once():
+    """Tests that formatting reuses one cached template per question and leaves no slots behind."""
+    javascript_template.cache_clear()
+    first = format_javascript("function twoSum(nums, target) {}", '{"nums": [1], "target": 1}', "twoSum")
+    second = format_javascript("function twoSum(nums, target) {}", "[1, 2]", "twoSum")
+
+    assert javascript_template.cache_info().misses == 1
+    assert javascript_template.cache_info().hits == 1
+    # The input shape is checked at runtime, so both inputs share the same call block
+    assert "'nums' in input && 'target' in input" in first
+    assert "'nums' in input && 'target' in input" in second
+    assert "\0" not in first and "\0" not in format_go_batch("", ["[1]"], "foo")
+
+def test_execute_code_concurrently_keeps_order_and_bounds_workers():
+    """Tests that concurrent execution returns results in input order with bounded parallelism."""
+    lock = threading.Lock()
+    in_flight = {"now": 0, "max": 0}
+
+    def side_effect(code, test_input, expected_method, language):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        # Later inputs finish first, so completion order differs from input order
+        time.sleep(0.05 / (int(test_input) + 1))
+        with lock:
+            in_flight["now"] -= 1
+        return {"output": int(test_input), "stdout": None, "stderr": None}
+
+    with patch("website.code_execution.execute_code_with_test", side_effect=side_effect):
+        results = execute_code_concurrently("code", [str(i) for i in range(10)], "foo", "python")
+
+    assert [r["output"] for r in results] == list(range(10))
+    assert 1 < in_flight["max"] <= 4
+
+def test_run_tests_concurrent_mode(app):
+    """Tests that run_tests uses per-test concurrent calls when configured to."""
+    app.config["CODE_EXECUTION_MODE"] = "concurrent"
+    app.config["CODE_EXECUTION_MAX_WORKERS"] = 2
+    test_cases = [TestCaseStub("[1, 2, 3]", "6", True), TestCaseStub("[4, 5]", "9", False)]
+
+    def side_effect(code, test_input, expected_method, language):
+        return {"output": sum(json.loads(test_input)), "stdout": None, "stderr": None}
+
+    with patch("website.code_execution.execute_code_with_test", side_effect=side_effect) as mock_exec, \
+         patch("website.code_execution.execute_code_with_tests") as mock_batch:
+        results, all_passed = run_tests("code", test_cases, "sumArray", "python")
+
+    assert mock_exec.call_count == 2
+    mock_batch.assert_not_called()
+    assert all_passed is True
+    assert [r["output"] for r in results] == [6, 9]
+
+def test_format_go_program_reads_arguments_from_stdin():
+    """Tests the compiled Go program is independent of the input, which is sent as JSON."""
+    program = format_go_program("func twoSum(nums []int, target int) []int { return nil }", "twoSum")
+    assert "reflect.ValueOf(twoSum)" in program
+    assert "json.NewDecoder(os.Stdin)" in program
+
+    program_input = json.loads(format_go_program_input('{"target": 9, "nums": [2, 7]}', "twoSum"))
+    assert program_input["args"] == [[2, 7], 9]
+    assert json.loads(format_go_program_input("[1, 2]", "sumArray"))["args"] == [[1, 2]]
+
+def sum_array_results(code, test_inputs, expected_method, language):
+    """Returns a correct sumArray result for every test input."""
+    return [{"output": sum(json.loads(test_input)), "stdout": None, "stderr": None}
+            for test_input in test_inputs]
+
+@pytest.mark.usefixtures("sample_data")
+def test_submit_runs_job_inline_and_records_submission(client, app):
+    """Tests /submit returns a job whose status holds the results and the saved submission."""
+    app.config["CODE_EXECUTION_JOB_WORKERS"] = 0
+    app.config["CODE_EXECUTION_JOB_CHUNK_SIZE"] = 1
+    with patch("website.code_execution.execute_code_with_tests", side_effect=sum_array_results) as mock_exec:
+        response = client.post("/submit/1", json={"code": "solution", "language": "python"})
+
+    assert response.status_code == 202
+    assert mock_exec.call_count == 2
+    job = client.get(response.get_json()["statusUrl"]).get_json()
+    assert job["status"] == "completed"
+    assert job["passed"] is True
+    assert (job["completed"], job["total"]) == (2, 2)
+    assert [r["input"] for r in job["results"]] == ["[1, 2, 3]", "Hidden"]
+    with app.app_context():
+        assert db.session.get(Submission, job["submissionID"]).result == "Passed"
+
+@pytest.mark.usefixtures("sample_data")
+def test_submit_runs_job_in_background(client):
+    """Tests a queued job is picked up by a background worker."""
+    pool = ThreadPoolExecutor(max_workers=1)
+    with patch("website.code_execution.get_submission_job_pool", return_value=pool), \
+         patch("website.code_execution.execute_code_with_tests", side_effect=sum_array_results):
+        response = client.post("/submit/1", json={"code": "solution", "language": "python"})
+        pool.shutdown(wait=True)
+
+    job = client.get(response.get_json()["statusUrl"]).get_json()
+    assert job["status"] == "completed"
+    assert job["passed"] is True
+
+def measured_results(code, test_inputs, expected_method, language):
+    """Returns a correct sumArray result with runtime and peak memory for every test input."""
+    return [{"output": sum(json.loads(test_input)), "stdout": None, "stderr": None,
+             "runtime": 1.4 * len(json.loads(test_input)), "memory": 1000 * len(json.loads(test_input))}
+            for test_input in test_inputs]
+
+@pytest.mark.usefixtures("sample_data")
+def test_submit_records_runtime_and_peak_memory(client, app):
+    """Tests a submission stores its total runtime and reports per-test and peak measurements."""
+    app.config["CODE_EXECUTION_JOB_WORKERS"] = 0
+    with patch("website.code_execution.execute_code_with_tests", side_effect=measured_results):
+        response = client.post("/submit/1", json={"code": "solution", "language": "python"})
+
+    job = client.get(response.get_json()["statusUrl"]).get_json()
+    assert [r["runtime"] for r in job["results"]] == [pytest.approx(4.2), pytest.approx(4.2)]
+    assert (job["runtime"], job["memory"]) == (pytest.approx(8.4), 3000)
+    assert job["fasterThan"] is None
+    with app.app_context():
+        assert db.session.get(Submission, job["submissionID"]).runtime == pytest.approx(8.4)
+
+@pytest.mark.usefixtures("sample_data")
+def test_passing_submissions_are_ranked_by_runtime(client, app):
+    """Tests each passing submit reports the share of earlier passing submissions it beat."""
+    app.config["CODE_EXECUTION_JOB_WORKERS"] = 0
+
+    def submit(runtime):
+        def timed_results(code, test_inputs, expected_method, language):
+            return [{**result, "runtime": runtime}
+                    for result in sum_array_results(code, test_inputs, expected_method, language)]
+
+        with patch("website.code_execution.execute_code_with_tests", side_effect=timed_results):
+            response = client.post("/submit/1", json={"code": f"solution {runtime}", "language": "python"})
+        return client.get(response.get_json()["statusUrl"]).get_json()
+
+    assert submit(5)["fasterThan"] is None
+    assert submit(50)["fasterThan"] == 0.0
+    assert submit(1)["fasterThan"] == 100.0
+
+    page = client.get("/questions/1").get_data(as_text=True)
+    assert "Your best runtime: 2 ms, faster than 100.0% of python submissions" in page
+
+def test_summarize_performance_skips_missing_measurements():
+    """Tests tests without measurements, such as failed builds, are left out of the totals."""
+    assert summarize_performance([{"runtime": 2.6, "memory": 10}, {"runtime": None, "memory": None}]) == \
+        {"runtime": 2.6, "memory": 10}
+    assert summarize_performance([{"runtime": None, "memory": None}]) == {"runtime": None, "memory": None}
+
+@pytest.mark.usefixtures("sample_data")
+def test_submission_job_status_unknown_or_stale(client, app):
+    """Tests unknown jobs are not found and jobs that stopped making progress are failed."""
+    assert client.get("/submissions/jobs/missing").status_code == 404
+
+    with app.app_context():
+        db.session.add(SubmissionJob(jobID="stale", userID=1, questionID=1, code="x",
+                                     language="python", status="running",
+                                     updatedAt=datetime.utcnow() - timedelta(hours=1)))
+        db.session.commit()
+
+    job = client.get("/submissions/jobs/stale").get_json()
+    assert job["status"] == "failed"
+    assert "interrupted" in job["error"]
+
+@pytest.mark.usefixtures("sample_data")
+def test_busy_user_is_turned_away_with_retry_after(client, app):
+    """Tests runs beyond the user's in-flight limit get a 429 and finished runs free their slot."""
+    app.config["CODE_EXECUTION_USER_LIMIT"] = 1
+    held = get_admission_controller().admit(1)
+
+    response = client.post("/run/1", json={"code": "x"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert "already have code running" in response.get_json()["error"]
+    assert client.post("/submit/1", json={"code": "x"}).status_code == 429
+
+    held.release()
+    with patch("website.code_execution.execute_code_with_test", side_effect=sum_array_result):
+        # The server closes the response once it is sent, which releases the slot
+        with client.post("/run/1/stream", json={"code": "x"}) as response:
+            response.get_data()
+        assert client.post("/run/1", json={"code": "x"}).status_code == 200
+    assert get_admission_controller().stats() == {"running": 0, "waiting": 0}
+
+@pytest.mark.usefixtures("sample_data")
+def test_metrics_report_phase_latency_and_errors(client, app, mock_requests_post, tmp_path):
+    """Tests /metrics reports each phase of a run and counts executor errors by type."""
+    app.config.update({"CODE_EXECUTION_METRICS_DIR": str(tmp_path),
+                       "CODE_EXECUTION_METRICS_TOKEN": "scrape-token"})
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"output": json.dumps([{"result": 6}])}
+    mock_requests_post.return_value = mock_response
+    client.post("/run/1", json={"code": "class Solution: pass", "language": "python"})
+
+    mock_response.status_code = 503
+    client.post("/run/1", json={"code": "class Solution: x = 1", "language": "python"})
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    for phase in ("format", "round_trip", "parse", "compare"):
+        assert (f'devready_execution_phase_seconds_count{{endpoint="run_code_samples",'
+                f'language="python",phase="{phase}"}}') in text
+    assert ('devready_execution_errors_total{endpoint="run_code_samples",language="python",'
+            'type="non_200"} 1') in text
+
+def test_metrics_require_the_configured_token(client, app):
+    """Tests /metrics is off without a token and turns away requests that do not send it."""
+    assert client.get("/metrics").status_code == 404
+
+    app.config["CODE_EXECUTION_METRICS_TOKEN"] = "scrape-token"
+    response = client.get("/metrics")
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"].startswith("Bearer")
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Basic scrape-token"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-token"}).status_code == 200
+
+def wrong_results(code, test_inputs, expected_method, language):
+    """Returns a wrong sumArray result for every test input."""
+    return [{"output": -1, "stdout": None, "stderr": None} for _ in test_inputs]
+
+@pytest.mark.usefixtures("sample_data")
+def test_fail_fast_submit_skips_hidden_tests_after_a_failing_sample(client, app):
+    """Tests fail-fast submits run the samples first and mark the tests after a failure not run."""
+    app.config.update({"CODE_EXECUTION_JOB_WORKERS": 0, "CODE_EXECUTION_SUBMIT_MODE": "fail_fast"})
+    with patch("website.code_execution.execute_code_with_tests", side_effect=wrong_results) as mock_exec:
+        response = client.post("/submit/1", json={"code": "solution", "language": "python"})
+
+    mock_exec.assert_called_once_with("solution", ["[1, 2, 3]"], "sumArray", "python")
+    job = client.get(response.get_json()["statusUrl"]).get_json()
+    assert job["status"] == "completed" and job["passed"] is False
+    assert job["completed"] == job["total"] == 2
+    assert [r.get("status") for r in job["results"]] == [None, "not run"]
+
+    with patch("website.code_execution.execute_code_with_tests", side_effect=sum_array_results) as mock_exec:
+        response = client.post("/submit/1", json={"code": "fixed", "language": "python"})
+    assert mock_exec.call_count == 2
+    assert client.get(response.get_json()["statusUrl"]).get_json()["passed"] is True
+
+@pytest.mark.usefixtures("sample_data")
+def test_fail_fast_submit_stops_after_the_failing_chunk(client, app):
+    """Tests fail-fast submits keep chunking the hidden tests and start no chunk after a failing one."""
+    app.config.update({"CODE_EXECUTION_JOB_WORKERS": 0, "CODE_EXECUTION_SUBMIT_MODE": "fail_fast",
+                       "CODE_EXECUTION_JOB_CHUNK_SIZE": 2})
+    with app.app_context():
+        db.session.add_all([TestCase(questionID=1, inputData="[7]", expectedOutput="7"),
+                            TestCase(questionID=1, inputData="[8]", expectedOutput="8")])
+        db.session.commit()
+
+    def fail_on_second_hidden(code, test_inputs, expected_method, language):
+        return [{"output": -1 if test_input == "[4, 5, 6]" else sum(json.loads(test_input)),
+                 "stdout": None, "stderr": None} for test_input in test_inputs]
+
+    with patch("website.code_execution.execute_code_with_tests",
+               side_effect=fail_on_second_hidden) as mock_exec:
+        response = client.post("/submit/1", json={"code": "solution", "language": "python"})
+
+    assert [call.args[1] for call in mock_exec.call_args_list] == [["[1, 2, 3]"], ["[4, 5, 6]", "[7]"]]
+    job = client.get(response.get_json()["statusUrl"]).get_json()
+    assert [r["passed"] for r in job["results"]] == [True, False, True, False]
+    assert [r.get("status") for r in job["results"]] == [None, None, None, "not run"]
+
+def parse_sse(body):
+    """Splits an SSE response body into (event, data) pairs."""
+    events = []
+    for message in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def sum_array_result(code, test_input, expected_method, language):
+    """Returns a correct sumArray result for one test input."""
+    return {"output": sum(json.loads(test_input)), "stdout": None, "stderr": None}
+
+@pytest.mark.usefixtures("sample_data")
+def test_submission_job_stream_sends_test_and_summary_events(client, app):
+    """Tests a job's stream replays its test results and summary without running any code."""
+    app.config["CODE_EXECUTION_JOB_WORKERS"] = 0
+    with patch("website.code_execution.execute_code_with_tests", side_effect=sum_array_results):
+        submitted = client.post("/submit/1", json={"code": "solution", "language": "python"}).get_json()
+
+    with patch("website.code_execution.execute_code_with_tests") as mock_exec:
+        response = client.get(submitted["streamUrl"])
+        events = parse_sse(response.get_data(as_text=True))
+
+    mock_exec.assert_not_called()
+    assert response.mimetype == "text/event-stream"
+    assert [(event, data["index"], data["total"]) for event, data in events[:-1]] == \
+        [("test", 0, 2), ("test", 1, 2)]
+    event, summary = events[-1]
+    assert event == "summary"
+    assert (summary["passed"], summary["passedCount"], summary["total"]) == (True, 2, 2)
+    with app.app_context():
+        assert db.session.get(Submission, summary["submissionID"]).result == "Passed"
+
+@pytest.mark.usefixtures("sample_data")
+def test_submission_job_stream_follows_a_running_job(client, app):
+    """Tests the stream sends each result the job runner publishes until the job finishes."""
+    first = {"input": "[1, 2, 3]", "output": 6, "passed": True}
+    second = {"input": "Hidden", "output": -1, "passed": False}
+    with app.app_context():
+        db.session.add(SubmissionJob(jobID="running", userID=1, questionID=1, code="x",
+                                     language="python", status="running", totalTests=2,
+                                     completedTests=1, results=json.dumps([first, None])))
+        db.session.commit()
+
+    def finish_job(_seconds):
+        # Stands in for the job runner committing from another thread while the stream waits
+        job = db.session.get(SubmissionJob, "running")
+        job.results = json.dumps([first, second])
+        job.completedTests = 2
+        job.status = "completed"
+        job.passed = False
+        db.session.commit()
+
+    with patch("website.code_execution.time.sleep", side_effect=finish_job) as mock_sleep:
+        events = parse_sse(client.get("/submissions/jobs/running/stream").get_data(as_text=True))
+
+    mock_sleep.assert_called_once_with(0.25)
+    assert [(event, data.get("index")) for event, data in events] == \
+        [("test", 0), ("test", 1), ("summary", None)]
+    assert (events[-1][1]["passed"], events[-1][1]["passedCount"]) == (False, 1)
+
+@pytest.mark.usefixtures("sample_data")
+def test_submission_job_stream_reports_failures_and_hides_other_users_jobs(client, app):
+    """Tests a failed job ends its stream with an error event and other users' jobs are not found."""
+    with app.app_context():
+        db.session.add_all([
+            SubmissionJob(jobID="failed", userID=1, questionID=1, code="x", language="python",
+                          status="failed", error="Failed to run submission: boom"),
+            SubmissionJob(jobID="theirs", userID=2, questionID=1, code="x", language="python")
+        ])
+        db.session.commit()
+
+    events = parse_sse(client.get("/submissions/jobs/failed/stream").get_data(as_text=True))
+    assert events == [("error", {"error": "Failed to run submission: boom"})]
+    assert client.get("/submissions/jobs/theirs/stream").status_code == 404
+    assert client.post("/submit/1/stream", json={"code": "x"}).status_code == 404
+
+@pytest.mark.usefixtures("sample_data")
+def test_stream_code_samples_reports_errors(client):
+    """Tests the streaming run endpoint only runs samples and reports failures as an error event."""
+    with patch("website.code_execution.execute_code_with_tests", side_effect=sum_array_results):
+        events = parse_sse(client.post("/run/1/stream", json={"code": "x"}).get_data(as_text=True))
+    assert [event for event, _ in events] == ["test", "summary"]
+    assert events[0][1]["input"] == "[1, 2, 3]"
+
+    with patch("website.code_execution.execute_code_with_tests", side_effect=RuntimeError("boom")):
+        events = parse_sse(client.post("/run/1/stream", json={"code": "x"}).get_data(as_text=True))
+    assert events == [("error", {"error": "Error running tests: boom"})]
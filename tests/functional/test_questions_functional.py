@@ -1,7 +1,9 @@
 """Functional tests for the questions API endpoints."""
 import pytest
-from website.models import Question, TestCase, QuestionTag
+from sqlalchemy import event
+from website.models import Question, TestCase, QuestionTag, Submission, Tag
 from website.extensions import db
+from website.progress import record_progress
 
 @pytest.mark.usefixtures("sample_data")
 def test_get_all_questions(client) -> None:
@@ -98,11 +100,7 @@ def test_get_all_questions_empty_db(client, app) -> None:
 @pytest.mark.usefixtures("sample_data")
 def test_get_all_questions_db_error(client, mocker):
     """Test database error handling when getting all questions."""
-    mock = mocker.patch(
-        'website.models.Question.query',
-        new_callable=mocker.PropertyMock
-    )
-    mock.return_value.all.side_effect = Exception("Database error")
+    mocker.patch('website.questions.db.session.query', side_effect=Exception("Database error"))
 
     response = client.get("/questions")
     assert response.status_code == 500
@@ -126,12 +124,7 @@ def test_get_question_by_id_db_error(client, mocker):
 @pytest.mark.usefixtures("sample_data")
 def test_get_questions_by_tag_db_error(client, mocker):
     """Test database error handling when getting questions by tag."""
-    mock_query = mocker.MagicMock()
-    mock_query.join.return_value = mock_query
-    mock_query.filter.return_value = mock_query
-    mock_query.all.side_effect = Exception("Database error")
-
-    mocker.patch('website.questions.Question.query', mock_query)
+    mocker.patch('website.questions.db.session.query', side_effect=Exception("Database error"))
 
     response = client.get("/questions/tags?tag=arrays")
     assert response.status_code == 500
@@ -149,7 +142,7 @@ def test_get_questions_by_tag_empty_result(client) -> None:
 def test_get_questions_malformed_json(client, mocker):
     """Test handling of malformed JSON in question data."""
     mocker.patch(
-        'website.models.Question.to_dict',
+        'website.questions.question_listing',
         side_effect=Exception("JSON error")
     )
     response = client.get("/questions")
@@ -195,3 +188,204 @@ def test_library_page(client):
     assert b"Sum Array" in response.data
     assert b"Reverse String" in response.data
 
+
+def count_queries(app, client, url):
+    """Returns the response to a GET of url and the number of SELECTs it ran, checking none
+    of them binds a parameter per question."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+            assert len(parameters) < 10
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return response, len(statements)
+
+@pytest.mark.usefixtures("sample_data")
+def test_question_listings_use_fixed_query_count(client, app) -> None:
+    """Test listing questions takes the same number of queries for 2 or 2000 questions."""
+    _, small_count = count_queries(app, client, "/questions")
+    _, small_tag_count = count_queries(app, client, "/questions/tags?tag=arrays")
+
+    with app.app_context():
+        tag = Tag.query.filter_by(name="arrays").first()
+        questions = [Question(title=f"Synthetic {index}", description="Generated",
+                              difficulty="easy") for index in range(2000)]
+        db.session.add_all(questions)
+        db.session.flush()
+        db.session.add_all([QuestionTag(questionID=question.questionID, tagID=tag.tagID)
+                            for question in questions])
+        for question in questions:
+            db.session.add_all([
+                TestCase(questionID=question.questionID, inputData="1", expectedOutput="1",
+                         isSample=True),
+                TestCase(questionID=question.questionID, inputData="2", expectedOutput="2")
+            ])
+        db.session.commit()
+
+    response, large_count = count_queries(app, client, "/questions")
+    assert response.status_code == 200
+    assert len(response.json) == 2002
+    assert response.json[-1]["tags"] == ["arrays"]
+    assert response.json[-1]["sample_test_cases"] == [{"input": "1", "expected_output": "1"}]
+    assert large_count == small_count
+
+    response, large_tag_count = count_queries(app, client, "/questions/tags?tag=arrays")
+    assert response.status_code == 200
+    assert len(response.json) == 2002
+    assert large_tag_count == small_tag_count
+
+@pytest.mark.usefixtures("sample_data")
+def test_question_listings_refresh_after_catalog_change(client, app) -> None:
+    """Test cached listings and the library pick up a question added after they were served."""
+    assert len(client.get("/questions").json) == 2
+    assert len(client.get("/questions/tags?tag=strings").json) == 1
+    assert b"Merge Lists" not in client.get("/library").data
+
+    with app.app_context():
+        question = Question(title="Merge Lists", description="Merge two lists", difficulty="Easy")
+        db.session.add(question)
+        db.session.flush()
+        db.session.add(QuestionTag(questionID=question.questionID,
+                                   tagID=Tag.query.filter_by(name="strings").first().tagID))
+        db.session.commit()
+
+    assert len(client.get("/questions").json) == 3
+    assert len(client.get("/questions/tags?tag=strings").json) == 2
+    assert b"Merge Lists" in client.get("/library").data
+
+@pytest.mark.usefixtures("sample_data")
+def test_question_listings_paginate_by_cursor(client) -> None:
+    """Test limit and after page through questions in ID order, linking each page to the next."""
+    response = client.get("/questions?limit=1")
+    assert response.status_code == 200
+    assert [q["title"] for q in response.json] == ["Sum Array"]
+    next_url = response.headers["Link"].split(">")[0].lstrip("<")
+    assert "after=1" in next_url and "limit=1" in next_url
+
+    response = client.get(next_url)
+    assert [q["title"] for q in response.json] == ["Reverse String"]
+    assert response.json[0]["tags"] == ["arrays", "strings"]
+    assert "Link" not in response.headers
+
+    response = client.get("/questions/tags?tag=arrays&limit=1&after=1")
+    assert [q["title"] for q in response.json] == ["Reverse String"]
+    assert "Link" not in response.headers
+
+    for query in ("limit=0", "limit=abc", "after=abc", "fields=title,secret"):
+        response = client.get(f"/questions?{query}")
+        assert response.status_code == 400
+        assert "error" in response.json
+
+@pytest.mark.usefixtures("sample_data")
+def test_question_listings_select_only_requested_fields(client, app) -> None:
+    """Test fields= returns and queries only the requested fields, plus the question ID."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/questions/tags?tag=strings&fields=id,title,difficulty,tags")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert response.json == [{"questionID": 2, "title": "Reverse String", "difficulty": "easy",
+                              "tags": ["arrays", "strings"]}]
+    assert not any("description" in statement or "test_case" in statement
+                   for statement in statements)
+
+@pytest.mark.usefixtures("sample_data")
+def test_question_listings_answer_conditional_requests(client, app) -> None:
+    """Test a matching If-None-Match gets a 304 without querying questions until the catalog changes."""
+    response = client.get("/questions")
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "public, no-cache"
+    assert client.get("/questions?limit=1").headers["ETag"] != etag
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/questions", headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert not any("FROM question" in statement for statement in statements)
+
+    with app.app_context():
+        db.session.get(Question, 1).title = "Sum Numbers"
+        db.session.commit()
+    response = client.get("/questions", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json[0]["title"] == "Sum Numbers"
+
+@pytest.mark.usefixtures("sample_data")
+def test_library_answers_conditional_requests(client, app) -> None:
+    """Test the library page is revalidated per user and changes once they pass a question."""
+    response = client.get("/library")
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert client.get("/library", headers={"If-None-Match": etag}).status_code == 304
+
+    with app.app_context():
+        submission = Submission(userID=1, questionID=2, code="pass", language="python",
+                                result="Passed")
+        db.session.add(submission)
+        db.session.flush()
+        record_progress(submission)
+        db.session.commit()
+    response = client.get("/library", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+@pytest.mark.usefixtures("sample_data")
+def test_tag_listing_loads_relations_for_page_questions_only(client, app) -> None:
+    """Test a sparse tag page only loads the tags and samples of the questions on it."""
+    with app.app_context():
+        tag = Tag.query.filter_by(name="strings").first()
+        questions = [Question(title=f"Filler {index}", description="Generated", difficulty="easy")
+                     for index in range(20)]
+        db.session.add_all(questions)
+        db.session.flush()
+        db.session.add(QuestionTag(questionID=questions[-1].questionID, tagID=tag.tagID))
+        db.session.add_all([TestCase(questionID=question.questionID, inputData="1",
+                                     expectedOutput="1", isSample=True) for question in questions])
+        db.session.commit()
+
+    loaded = {}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        for table in ("question_tag", "test_case"):
+            if f"FROM {table}" in statement:
+                loaded[table] = tuple(parameters)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/questions/tags?tag=strings&limit=2")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert [q["questionID"] for q in response.json] == [2, 22]
+    assert loaded["question_tag"] == (2, 22)
+    assert loaded["test_case"][-2:] == (2, 22)
@@ -0,0 +1,91 @@
+"""Unit tests for admission control of code execution requests."""
+import threading
+import time
+import pytest
+from website.admission import AdmissionController, AdmissionRejected
+
+def wait_until(condition, timeout=2):
+    """Polls condition until it holds, failing the test if it never does."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition never held"
+        time.sleep(0.001)
+
+def test_admits_up_to_the_per_user_limit():
+    """A user's requests beyond the limit are rejected while the slots are still free."""
+    controller = AdmissionController(slots=4, per_user_limit=2, queue_size=4, queue_timeout=1)
+    first = controller.admit("alice")
+    controller.admit("alice")
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit("alice")
+    assert rejected.value.retry_after >= 1
+    controller.admit("bob").release()
+
+    first.release()
+    first.release()
+    assert controller.stats() == {"running": 1, "waiting": 0}
+    controller.admit("alice")
+
+def test_full_queue_is_rejected_and_waiters_time_out():
+    """Requests are turned away once the queue is full, and waiters give up after the timeout."""
+    controller = AdmissionController(slots=1, per_user_limit=5, queue_size=1, queue_timeout=0.2,
+                                     initial_hold_time=3)
+    controller.admit("alice")
+    outcomes = []
+
+    def wait_for_slot():
+        try:
+            controller.admit("bob")
+        except AdmissionRejected:
+            outcomes.append("timed out")
+
+    waiter = threading.Thread(target=wait_for_slot)
+    waiter.start()
+    wait_until(lambda: controller.stats()["waiting"] == 1)
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit("carol")
+    # One request ahead through one slot of three seconds, then this one
+    assert rejected.value.retry_after == 6
+
+    waiter.join()
+    assert outcomes == ["timed out"]
+    assert controller.stats() == {"running": 1, "waiting": 0}
+
+def test_no_queue_timeout_rejects_at_once():
+    """Without a queue timeout a request finding every slot taken is turned away without waiting."""
+    controller = AdmissionController(slots=1, per_user_limit=5, queue_size=10, queue_timeout=0,
+                                     initial_hold_time=2)
+    running = controller.admit("alice")
+
+    started = time.monotonic()
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit("bob")
+    assert time.monotonic() - started < 0.1
+    assert rejected.value.retry_after == 2
+    assert controller.stats() == {"running": 1, "waiting": 0}
+
+    running.release()
+    controller.admit("bob")
+
+def test_slots_are_granted_fairly_between_users():
+    """A user with a queue of requests does not hold back another user's single request."""
+    controller = AdmissionController(slots=1, per_user_limit=10, queue_size=10, queue_timeout=5)
+    running = controller.admit("warmup")
+    granted = []
+
+    def request(user_id, cost):
+        ticket = controller.admit(user_id, cost)
+        granted.append(user_id)
+        ticket.release()
+
+    threads = []
+    for user_id, cost in [("alice", 1), ("alice", 1), ("alice", 1), ("bob", 1), ("carol", 20)]:
+        threads.append(threading.Thread(target=request, args=(user_id, cost)))
+        threads[-1].start()
+        wait_until(lambda count=len(threads): controller.stats()["waiting"] == count)
+
+    running.release()
+    for thread in threads:
+        thread.join()
+    assert granted == ["alice", "bob", "alice", "alice", "carol"]
@@ -1,7 +1,8 @@
 """This module contains unit tests for the AI."""
 from unittest import mock
 import pytest
-from website.ai_helper import get_openai_client, generate_response
+from website.ai_helper import get_analysis_cache, get_openai_client, generate_response
+from website.code_execution import get_execution_cache
 
 def test_get_openai_client_success(app):
     """Test the get_openai_client function when the API key is present."""
@@ -46,3 +47,19 @@ def test_generate_response_error_handling(app):
             user_hint, error = generate_response(system_prompt, user_prompt)
             assert user_hint is None
             assert error == "An unexpected error occurred."
+
+def test_analyses_are_cached_apart_from_execution_results(app):
+    """A repeated analysis is served from its own cache, not the execution result cache."""
+    analysis = '{"user_time_complexity": "O(n)", "user_space_complexity": "O(1)"}'
+    request = {"question_description": "Sum an array", "code": "return sum(arr)"}
+    client = app.test_client()
+    with mock.patch('website.ai_helper.generate_response',
+                    return_value=(analysis, None)) as mock_generate:
+        first = client.post('/analyze_submission', json=request).get_json()
+        second = client.post('/analyze_submission', json=request).get_json()
+
+    mock_generate.assert_called_once()
+    assert first == second
+    assert second["analysis"]["timeComplexity"] == "O(n)"
+    assert get_analysis_cache().stats() == {"hits": 1, "misses": 1}
+    assert get_execution_cache().stats() == {"hits": 0, "misses": 0}
@@ -0,0 +1,74 @@
+"""Unit tests for the versioned question catalog cache."""
+from website import create_app
+from website.catalog import cached_catalog, catalog_version
+from website.extensions import db
+from website.models import Question, Submission, Tag, User
+
+def test_catalog_writes_bump_version(app):
+    """Adding, editing and deleting catalog rows each bump the version once committed."""
+    with app.app_context():
+        start = catalog_version()
+        question = Question(title="Two Sum", description="Add them", difficulty="Easy")
+        db.session.add(question)
+        db.session.commit()
+        assert catalog_version() == start + 1
+
+        question.title = "Three Sum"
+        db.session.commit()
+        assert catalog_version() == start + 2
+
+        db.session.delete(question)
+        db.session.commit()
+        assert catalog_version() == start + 3
+
+def test_rolled_back_and_unrelated_writes_keep_version(app):
+    """Rolled back catalog writes and writes to other tables leave the version alone."""
+    with app.app_context():
+        question = Question(title="Two Sum", description="Add them", difficulty="Easy")
+        user = User(username="coder", email="coder@example.com", passwordHash="hashed")
+        db.session.add_all([question, user])
+        db.session.commit()
+        start = catalog_version()
+
+        db.session.add(Tag(name="arrays"))
+        db.session.flush()
+        db.session.rollback()
+        assert catalog_version() == start
+
+        db.session.add(Submission(userID=user.userID, questionID=question.questionID,
+                                  code="pass", language="python", result="Passed"))
+        db.session.commit()
+        assert catalog_version() == start
+
+def test_cached_catalog_rebuilds_after_a_write(app):
+    """Data is built once per version and rebuilt once the catalog changes."""
+    builds = []
+
+    def build():
+        builds.append(Question.query.count())
+        return builds[-1]
+
+    with app.app_context():
+        assert cached_catalog("count", build) == 0
+        assert cached_catalog("count", build) == 0
+        db.session.add(Question(title="Two Sum", description="Add them", difficulty="Easy"))
+        db.session.commit()
+        assert cached_catalog("count", build) == 1
+    assert builds == [0, 1]
+
+def test_catalog_changes_reach_other_workers(tmp_path):
+    """A write through one app is seen by another app with its own cache on the same database."""
+    config = {'TESTING': True, 'SECRET_KEY': 'test',
+              'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'catalog.db'}"}
+    writer, reader = create_app(dict(config)), create_app(dict(config))
+
+    with reader.app_context():
+        assert cached_catalog("titles", lambda: [q.title for q in Question.query]) == []
+    with writer.app_context():
+        db.session.add(Question(title="Two Sum", description="Add them", difficulty="Easy"))
+        db.session.commit()
+    with reader.app_context():
+        assert cached_catalog("titles", lambda: [q.title for q in Question.query]) == ["Two Sum"]
+        db.session.remove()
+    with writer.app_context():
+        db.session.remove()
@@ -1,9 +1,9 @@
 """Unit tests for code execution API."""
-from website.code_execution import execute_code_with_test
+from website.code_execution import execute_code_with_test, run_test_suite
 from unittest.mock import patch
 import json
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_execute_code_with_valid_input(mock_post):
     '''Mocking the test input and expected output for a valid case'''
     mock_response = type('MockResponse', (), {
@@ -25,7 +25,7 @@ def test_execute_code_with_valid_input(mock_post):
     assert result["stdout"] is None
     assert result["output"] == 5
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_execute_code_with_invalid_input(mock_post):
     '''Mocking a case where the code raises an exception'''
     mock_response = type('MockResponse', (), {
@@ -48,7 +48,7 @@ def test_execute_code_with_invalid_input(mock_post):
     assert result["stderr"] is not None
     assert result["output"] is None
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_execute_code_with_non_serializable_output(mock_post):
     '''Mocking a case where the output includes non-serializable types like deque'''
     mock_response = type('MockResponse', (), {
@@ -72,3 +72,15 @@ def test_execute_code_with_non_serializable_output(mock_post):
     assert result["stderr"] is None
     assert result["stdout"] is None
     assert result["output"] == expected_output
+
+def test_suite_timeout_is_capped(app):
+    '''A large suite gets the per-test budget for each test, but no more than the cap'''
+    app.config["CODE_EXECUTION_MAX_SUITE_TIMEOUT"] = 30
+    with app.app_context(), patch('website.code_execution.run_on_executor',
+                                  return_value=('[]', None)) as mock_run:
+        run_test_suite("code", ["1", "2"], "number", "python")
+        assert mock_run.call_args.args[0]["timeout"] == 10
+
+        run_test_suite("code", [str(i) for i in range(100)], "number", "python")
+        assert mock_run.call_args.args[0]["timeout"] == 30
+        assert mock_run.call_args.kwargs["timeout"] == 35
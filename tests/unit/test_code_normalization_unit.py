@@ -0,0 +1,32 @@
+"""Unit tests for canonical forms of submitted code."""
+from website.code_normalization import code_fingerprints, normalize_code
+
+def test_python_ignores_comments_docstrings_and_formatting():
+    """Python that differs only cosmetically normalizes to the same code."""
+    original = "class Solution:\n    def f(self, x):\n        return x*2\n"
+    edited = ('class Solution:\n    """Doubles."""\n\n    def f(self,   x):  # double it\n'
+              '        """The answer."""\n        return (x * 2)\n')
+    assert normalize_code(edited, "python") == normalize_code(original, "python")
+    assert normalize_code("def f(x):\n    return x*3", "python") != normalize_code(original, "python")
+    assert normalize_code("def f(:", "python") == "def f(:"
+
+def test_c_like_languages_keep_literals_and_line_breaks():
+    """Comments and whitespace runs are dropped, but not inside literals or across newlines."""
+    code = ("// sum\nfunction f(a,  b) {  /* add */\n\n    const s = 'a  b';\n"
+            "    return a +   b / 2 + /x  y/.source.length + `t  ${ a }`;\n}")
+    assert normalize_code(code, "javascript") == (
+        "function f(a, b) {\nconst s = 'a  b';\n"
+        "return a + b / 2 + /x  y/.source.length + `t  ${ a }`;\n}")
+    # Newlines end statements, so they are never joined away
+    assert normalize_code("return\nx", "javascript") != normalize_code("return x", "javascript")
+    assert normalize_code("s := `a  \\`  +  x", "go") == "s := `a  \\` + x"
+    # A slash after a closing brace may start a regular expression, so it is left alone
+    assert normalize_code("if (a) {}\n/a  b/.test(s)", "javascript") == "if (a) {}\n/a  b/.test(s)"
+
+def test_fingerprints():
+    """Canonical fingerprints match for cosmetic edits while exact fingerprints do not."""
+    canonical, exact = code_fingerprints("func f() int {\n\treturn 1 // one\n}", "go")
+    edited_canonical, edited_exact = code_fingerprints("func f() int {\n    return 1\n}\n", "go")
+    assert canonical == edited_canonical
+    assert exact != edited_exact
+    assert code_fingerprints("x = 1", "python")[0] != code_fingerprints("x = 1", "javascript")[0]
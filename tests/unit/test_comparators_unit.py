@@ -0,0 +1,65 @@
+"""Unit tests for output comparators and precomputed expected outputs."""
+import pytest
+from unittest.mock import patch
+from website import db
+from website.code_execution import run_tests
+from website.comparators import (EXACT, FLOAT_TOLERANCE, NESTED_UNORDERED, UNORDERED,
+                                 canonical_expected, compare_output, get_comparator,
+                                 precompute_expected_outputs_command)
+from website.models import ExpectedOutput, Question, QuestionComparator, TestCase
+
+def test_compare_output_by_comparator():
+    """Each comparator ignores only the differences it is meant to."""
+    assert compare_output([2, 1], canonical_expected("[1, 2]", UNORDERED), UNORDERED) == (True, [1, 2])
+    assert compare_output([2, 1], canonical_expected("[1, 2]", EXACT), EXACT)[0] is False
+    assert compare_output([[3, 1], [2, 0]], canonical_expected("[[0, 2], [1, 3]]", NESTED_UNORDERED),
+                          NESTED_UNORDERED)[0] is True
+    assert compare_output(None, canonical_expected("[]", UNORDERED), UNORDERED)[0] is True
+    assert compare_output(0.3333334, canonical_expected("0.3333333", FLOAT_TOLERANCE),
+                          FLOAT_TOLERANCE, 1e-5)[0] is True
+    assert compare_output(0.34, canonical_expected("0.3333333", FLOAT_TOLERANCE),
+                          FLOAT_TOLERANCE, 1e-5)[0] is False
+
+def test_compare_output_matches_python_equality():
+    """Integral floats equal their ints and expected outputs that are not JSON compare as strings."""
+    assert compare_output(2.0, canonical_expected("2", EXACT), EXACT)[0] is True
+    assert compare_output({"b": 1, "a": 2}, canonical_expected('{"a": 2, "b": 1}', EXACT), EXACT)[0] is True
+    assert compare_output("hello", canonical_expected("hello", EXACT), EXACT)[0] is True
+
+@pytest.mark.usefixtures("sample_data")
+def test_expected_outputs_are_precomputed_on_save(app):
+    """Saving a test case, or changing its question's comparator, stores its canonical expected output."""
+    test = TestCase.query.filter_by(questionID=1, isSample=True).one()
+    assert (test.expectation.comparator, test.expectation.canonical) == (EXACT, "6")
+
+    test.expectedOutput = "[3, 1, 2]"
+    db.session.commit()
+    assert test.expectation.canonical == "[3,1,2]"
+
+    db.session.add(QuestionComparator(questionID=1, comparator=UNORDERED))
+    db.session.commit()
+    assert (test.expectation.comparator, test.expectation.canonical) == (UNORDERED, "[1,2,3]")
+    assert get_comparator(1, "sumArray") == (UNORDERED, 1e-6)
+
+@pytest.mark.usefixtures("sample_data")
+def test_run_tests_uses_precomputed_expected_outputs(app):
+    """Submits compare against the stored canonical form without parsing expected outputs again."""
+    question = db.session.get(Question, 1)
+    with patch("website.code_execution.execute_code_with_tests") as mock_exec, \
+         patch("website.comparators.parse_expected") as mock_parse:
+        mock_exec.return_value = [{"output": 6, "stdout": None, "stderr": None},
+                                  {"output": 15.0, "stdout": None, "stderr": None}]
+        results, all_passed = run_tests("code", question.testCases, "sumArray", "python")
+
+    assert all_passed is True
+    mock_parse.assert_not_called()
+
+@pytest.mark.usefixtures("sample_data")
+def test_precompute_command_backfills_missing_rows(app):
+    """The CLI command canonicalizes test cases saved before expected outputs were precomputed."""
+    ExpectedOutput.query.delete()
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(precompute_expected_outputs_command)
+    assert "Precomputed 2 expected outputs" in result.output
+    assert ExpectedOutput.query.count() == 2
@@ -0,0 +1,163 @@
+"""Unit tests for the execution result cache."""
+import json
+import os
+import time
+from unittest.mock import patch, MagicMock
+import pytest
+from website.execution_cache import (ExecutionCache, FileCacheBackend, MemoryCacheBackend,
+                                     execution_cache_key)
+from website.code_execution import execute_code_with_tests, get_execution_cache
+
+def test_cache_key_is_stable_and_distinct():
+    """Equal parts give equal keys and any change gives a new key."""
+    assert execution_cache_key(1, "python", "f", "code", "[1]") == \
+        execution_cache_key(1, "python", "f", "code", "[1]")
+    assert execution_cache_key(1, "python", "f", "code", "[1]") != \
+        execution_cache_key(2, "python", "f", "code", "[1]")
+
+def test_memory_backend_evicts_least_recently_used():
+    """Entries past the byte cap are evicted oldest-use first."""
+    backend = MemoryCacheBackend(max_bytes=10, ttl=60)
+    backend.set("a", b"aaaa")
+    backend.set("b", b"bbbb")
+    backend.get("a")
+    backend.set("c", b"cccc")
+
+    assert backend.get("a") == b"aaaa"
+    assert backend.get("b") is None
+    assert backend.get("c") == b"cccc"
+
+def test_memory_backend_expires_entries():
+    """Entries are dropped once their TTL has passed."""
+    backend = MemoryCacheBackend(max_bytes=100, ttl=10)
+    with patch("website.execution_cache.time.time", return_value=1000.0):
+        backend.set("a", b"data")
+    with patch("website.execution_cache.time.time", return_value=1011.0):
+        assert backend.get("a") is None
+
+def test_file_backend_is_shared_between_instances(tmp_path):
+    """Two workers pointing at one directory see each other's entries."""
+    first = FileCacheBackend(str(tmp_path), max_bytes=1000, ttl=60)
+    second = FileCacheBackend(str(tmp_path), max_bytes=1000, ttl=60)
+    first.set("ab12", b"result")
+    assert second.get("ab12") == b"result"
+    assert second.get("cd34") is None
+
+def test_file_backend_refuses_a_shared_directory(tmp_path):
+    """Entries could be forged in a directory others can write to, so it is not used."""
+    os.chmod(tmp_path, 0o777)
+    with pytest.raises(PermissionError, match="writable by other users"):
+        FileCacheBackend(str(tmp_path), max_bytes=1000, ttl=60)
+
+def test_file_backend_prunes_to_size(tmp_path):
+    """Pruning removes the least recently used files until under the byte cap."""
+    backend = FileCacheBackend(str(tmp_path), max_bytes=60, ttl=60, prune_interval=1000)
+    now = time.time()
+    for offset, key in enumerate(["aa01", "aa02", "aa03"]):
+        backend.set(key, b"x" * 20)
+        os.utime(backend._path(key), (now - 3 + offset, now - 3 + offset))
+
+    backend.prune()
+    assert backend.get("aa01") is None
+    assert backend.get("aa02") is None
+    assert backend.get("aa03") == b"x" * 20
+
+def test_execution_cache_counts_hits_and_misses():
+    """The cache round-trips JSON results and counts lookups."""
+    cache = ExecutionCache(MemoryCacheBackend(max_bytes=1000, ttl=60))
+    assert cache.get("k") is None
+    cache.set("k", {"output": 6, "stdout": None, "stderr": None})
+    assert cache.get("k") == {"output": 6, "stdout": None, "stderr": None}
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+def make_batch_response(results):
+    """Builds a mock executor response holding a batch of results."""
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"output": json.dumps(results)}
+    return response
+
+@patch("requests.Session.post")
+def test_repeated_run_only_executes_new_inputs(mock_post):
+    """A second run of the same code only sends inputs that were not cached."""
+    code = "class Solution:\n    def sumArray(self, arr):\n        return sum(arr)"
+    mock_post.return_value = make_batch_response([{"result": 6}])
+    execute_code_with_tests(code, ["[1, 2, 3]"], "sumArray", "python")
+
+    mock_post.return_value = make_batch_response([{"result": 9}])
+    results = execute_code_with_tests(code, ["[1, 2, 3]", "[4, 5]"], "sumArray", "python")
+
+    assert [r["output"] for r in results] == [6, 9]
+    assert mock_post.call_count == 2
+    sent_code = mock_post.call_args.kwargs["json"]["code"]
+    assert "[4, 5]" in sent_code
+    assert "[1, 2, 3]" not in sent_code
+    assert get_execution_cache().stats()["hits"] == 1
+
+@patch("requests.Session.post")
+def test_executor_errors_are_not_cached(mock_post):
+    """Results produced by an executor outage are retried on the next run."""
+    error_response = MagicMock()
+    error_response.status_code = 400
+    error_response.text = "bad gateway"
+    mock_post.return_value = error_response
+    execute_code_with_tests("code", ["1"], "foo", "python")
+
+    mock_post.return_value = make_batch_response([{"result": 1}])
+    results = execute_code_with_tests("code", ["1"], "foo", "python")
+
+    assert results[0]["output"] == 1
+    assert mock_post.call_count == 2
+
+@patch("requests.Session.post")
+def test_cosmetic_edits_reuse_results_but_not_errors(mock_post):
+    """Reformatted code hits the cache, except for error output that quotes the exact code."""
+    code = "class Solution:\n    def sumArray(self, arr):\n        return sum(arr)"
+    mock_post.return_value = make_batch_response([{"result": 6}, {"result": None, "stderr": "boom"}])
+    execute_code_with_tests(code, ["[1, 2, 3]", "[]"], "sumArray", "python")
+
+    mock_post.return_value = make_batch_response([{"result": None, "stderr": "boom on line 4"}])
+    edited = "class Solution:\n    # Adds them up\n    def sumArray(self, arr):\n        return sum( arr )\n"
+    results = execute_code_with_tests(edited, ["[1, 2, 3]", "[]"], "sumArray", "python")
+
+    assert results[0]["output"] == 6
+    assert results[1]["stderr"] == ["boom on line 4"]
+    assert mock_post.call_count == 2
+    assert "[1, 2, 3]" not in mock_post.call_args.kwargs["json"]["code"]
+    # The edited code's error replaced the original's, so the original runs again
+    execute_code_with_tests(code, ["[]"], "sumArray", "python")
+    assert mock_post.call_count == 3
+
+def make_output_response(output):
+    """Builds a mock executor response whose program printed output instead of JSON results."""
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"output": output}
+    return response
+
+@patch("requests.Session.post")
+def test_batch_failures_are_not_cached_for_sibling_tests(mock_post):
+    """Output that is not JSON may come from one test exiting or the suite timing out, so
+    the other tests of the batch run again rather than replaying it."""
+    code = "class Solution:\n    def sumArray(self, arr):\n        exit() if not arr else None"
+    mock_post.return_value = make_output_response("")
+    execute_code_with_tests(code, ["[1, 2, 3]", "[]"], "sumArray", "python")
+
+    mock_post.return_value = make_batch_response([{"result": None}])
+    results = execute_code_with_tests(code, ["[1, 2, 3]"], "sumArray", "python")
+
+    assert results[0]["stderr"] is None
+    assert mock_post.call_count == 2
+
+@patch("requests.Session.post")
+def test_batch_compile_errors_are_cached(mock_post):
+    """A compile error is reported before any test runs, so it is cached for every test."""
+    code = "class Solution:\n    def sumArray(self, arr:\n        return 0"
+    mock_post.return_value = make_output_response(
+        '  File "/tmp/main.py", line 11\n    def sumArray(self, arr:\n'
+        "                       ^\nSyntaxError: '(' was never closed\n")
+    execute_code_with_tests(code, ["[1, 2, 3]", "[]"], "sumArray", "python")
+    results = execute_code_with_tests(code, ["[]"], "sumArray", "python")
+
+    assert results[0]["stderr"][-1] == "SyntaxError: '(' was never closed"
+    assert mock_post.call_count == 1
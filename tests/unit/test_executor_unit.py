@@ -0,0 +1,397 @@
+"""Unit tests for the code execution backends."""
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+from unittest.mock import patch, MagicMock
+import pytest
+import requests
+from website import create_app, executor
+from website.executor import (CompiledProgramCache, ExecutorClient, ExecutorUnavailableError,
+                              ExecutionBackendError, LocalExecutor, PythonWorkerPool)
+from website.executor_stub import create_stub_app
+from website.code_execution import (execute_code_with_test, execute_code_with_tests,
+                                    get_executor_client, get_execution_backend)
+
+# Unprivileged user and group that local runs switch to, nobody and nogroup on most systems
+SANDBOX_UID = SANDBOX_GID = 65534
+
+def sandbox_available():
+    """Returns True if runs can switch to the sandbox user and it can start this interpreter."""
+    if executor.resource is None or os.geteuid() != 0:
+        return False
+    try:
+        probe = subprocess.run([sys.executable, "-I", "-c", "pass"], user=SANDBOX_UID, group=SANDBOX_GID,
+                               capture_output=True, check=False)
+    except OSError:
+        return False
+    return probe.returncode == 0
+
+local_only = pytest.mark.skipif(not sandbox_available(),
+                                reason="local runs need root, rlimits and an interpreter the sandbox user can run")
+
+def make_local(**kwargs):
+    """Builds a local backend that runs as the sandbox user."""
+    return LocalExecutor(SANDBOX_UID, SANDBOX_GID, **kwargs)
+
+LOCAL_CONFIG = {"CODE_EXECUTION_BACKEND": "local", "CODE_EXECUTION_SANDBOX_UID": SANDBOX_UID,
+                "CODE_EXECUTION_SANDBOX_GID": SANDBOX_GID}
+
+@pytest.fixture
+def go_cache_dir():
+    """Gives a test its own cold Go build cache, so it does not depend on earlier builds.
+
+    The sandbox user cannot reach into tmp_path, so the cache sits in a fresh directory
+    under the system temp dir that it may pass through.
+    """
+    base = tempfile.mkdtemp(prefix="devready-test-")
+    os.chmod(base, 0o711)
+    try:
+        yield os.path.join(base, "go-cache")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+def make_response(status_code):
+    """Builds a mock executor response with the given status code."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = "error"
+    return response
+
+def make_client(**kwargs):
+    """Builds a client that retries without sleeping."""
+    return ExecutorClient("http://executor.test/run", backoff_base=0, **kwargs)
+
+def test_post_retries_server_errors():
+    """502 and 503 responses are retried until a good response arrives."""
+    client = make_client(max_retries=2)
+    with patch.object(client.session, "post",
+                      side_effect=[make_response(503), make_response(200)]) as mock_post:
+        response = client.post({"code": "x"}, timeout=1)
+
+    assert response.status_code == 200
+    assert mock_post.call_count == 2
+
+def test_post_returns_last_server_error():
+    """When every attempt fails with a 5xx, the final response is returned."""
+    client = make_client(max_retries=1)
+    with patch.object(client.session, "post", return_value=make_response(502)) as mock_post:
+        response = client.post({"code": "x"}, timeout=1)
+
+    assert response.status_code == 502
+    assert mock_post.call_count == 2
+
+@pytest.mark.parametrize("status_code", [500, 504])
+def test_post_does_not_retry_errors_from_running_code(status_code):
+    """500 and 504 may come from code that already ran, so they are returned without a retry."""
+    client = make_client(max_retries=3)
+    with patch.object(client.session, "post", return_value=make_response(status_code)) as mock_post:
+        response = client.post({"code": "x"}, timeout=1)
+
+    assert response.status_code == status_code
+    assert mock_post.call_count == 1
+
+def test_post_does_not_retry_read_timeouts():
+    """A read timeout means the code may still be running, so it is raised without a retry."""
+    client = make_client(max_retries=3)
+    with patch.object(client.session, "post",
+                      side_effect=requests.ReadTimeout("slow")) as mock_post:
+        with pytest.raises(requests.ReadTimeout):
+            client.post({"code": "x"}, timeout=1)
+
+    assert mock_post.call_count == 1
+
+def test_post_does_not_retry_client_errors():
+    """4xx responses are returned immediately."""
+    client = make_client(max_retries=3)
+    with patch.object(client.session, "post", return_value=make_response(400)) as mock_post:
+        response = client.post({"code": "x"}, timeout=1)
+
+    assert response.status_code == 400
+    assert mock_post.call_count == 1
+
+def test_post_raises_after_connection_errors():
+    """Connection errors are retried and re-raised once retries run out."""
+    client = make_client(max_retries=2)
+    with patch.object(client.session, "post",
+                      side_effect=requests.ConnectionError("refused")) as mock_post:
+        with pytest.raises(requests.ConnectionError):
+            client.post({"code": "x"}, timeout=1)
+
+    assert mock_post.call_count == 3
+
+def test_circuit_opens_and_recovers():
+    """The circuit opens after repeated failures and lets a trial call through after cooling down."""
+    client = make_client(max_retries=0, failure_threshold=2, reset_timeout=30)
+    with patch("website.executor.time.monotonic", return_value=100.0), \
+         patch.object(client.session, "post", return_value=make_response(502)):
+        client.post({}, timeout=1)
+        client.post({}, timeout=1)
+        assert client.is_open()
+        with pytest.raises(ExecutorUnavailableError):
+            client.post({}, timeout=1)
+
+    with patch("website.executor.time.monotonic", return_value=131.0), \
+         patch.object(client.session, "post", return_value=make_response(200)):
+        assert client.post({}, timeout=1).status_code == 200
+        assert not client.is_open()
+
+def test_execute_code_with_test_fails_fast_when_circuit_open():
+    """An open circuit is reported to the user as a clear stderr message."""
+    client = get_executor_client()
+    with patch.object(client, "_opened_at", 0.0), \
+         patch("website.executor.time.monotonic", return_value=1.0), \
+         patch.object(client.session, "post") as mock_post:
+        result = execute_code_with_test("class Solution: pass", "1", "foo", "python")
+
+    mock_post.assert_not_called()
+    assert result["output"] is None
+    assert "Code execution service is unavailable" in result["stderr"][0]
+
+def test_executor_client_is_shared():
+    """Every caller in the process shares one client and connection pool."""
+    assert get_executor_client() is get_executor_client()
+
+def test_remote_backend_is_default(app):
+    """The remote executor is used unless the local backend is configured."""
+    assert get_execution_backend() is get_executor_client()
+    app.config.update(LOCAL_CONFIG)
+    assert isinstance(get_execution_backend(), LocalExecutor)
+
+def test_local_backend_requires_sandbox_user(app):
+    """The local backend is refused without an unprivileged user and group to run as."""
+    app.config["CODE_EXECUTION_BACKEND"] = "local"
+    with pytest.raises(ExecutionBackendError, match="sandbox user"):
+        get_execution_backend()
+    with pytest.raises(ExecutionBackendError, match="sandbox user"):
+        LocalExecutor(0, 0)
+    with pytest.raises(RuntimeError, match="CODE_EXECUTION_SANDBOX_UID"):
+        create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+                    "CODE_EXECUTION_BACKEND": "local"})
+
+def test_unconfined_run_is_a_backend_error():
+    """A run that could not switch to the sandbox user is a backend failure, not program output."""
+    with pytest.raises(ExecutionBackendError, match="Could not enter the sandbox"):
+        make_local()._output(126, "", "Could not enter the sandbox: unshare: Operation not permitted\n", 5)
+
+@local_only
+def test_local_backend_isolates_submissions(tmp_path):
+    """Spawned and forked runs switch to the sandbox user, cannot read the web server's
+    environment or files, and have no network."""
+    secret = tmp_path / "secret"
+    secret.write_text("key")
+    secret.chmod(0o600)
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    code = "\n".join([
+        "import os, socket",
+        "print(os.getuid())",
+        f"for path in ['/proc/{os.getpid()}/environ', '{secret}']:",
+        "    try:",
+        "        open(path).read()",
+        "        print('read')",
+        "    except OSError:",
+        "        print('denied')",
+        "try:",
+        f"    socket.create_connection(('127.0.0.1', {listener.getsockname()[1]}), timeout=2)",
+        "    print('connected')",
+        "except OSError:",
+        "    print('offline')"
+    ])
+    payload = {"language": "python", "code": code, "timeout": 5}
+    expected = [str(SANDBOX_UID), "denied", "denied", "offline"]
+
+    pool = PythonWorkerPool(size=1)
+    try:
+        assert make_local().run(payload, timeout=10).split() == expected
+        assert make_local(python_pool=pool).run(payload, timeout=10).split() == expected
+    finally:
+        pool.close()
+        listener.close()
+
+@local_only
+def test_local_backend_runs_python_suite(app):
+    """The local backend runs the batch harness in a subprocess."""
+    app.config.update(LOCAL_CONFIG)
+    code = "class Solution:\n    def sumArray(self, arr):\n        print('hi')\n        return sum(arr)"
+    results = execute_code_with_tests(code, ["[1, 2, 3]", "[4, 5]"], "sumArray", "python")
+
+    assert [r["output"] for r in results] == [6, 9]
+    assert results[0]["stdout"] == ["hi"]
+
+@local_only
+def test_local_backend_feeds_payload_stdin(app):
+    """The payload's stdin text reaches the program, both forked from the pool and spawned."""
+    app.config.update({**LOCAL_CONFIG, "CODE_EXECUTION_PYTHON_POOL_SIZE": 1})
+    payload = {"language": "python", "code": "import sys\nprint(sys.stdin.read()[::-1])",
+               "stdin": "abc", "timeout": 5}
+    assert get_execution_backend().run(payload, timeout=10).strip() == "cba"
+    assert make_local().run(payload, timeout=10).strip() == "cba"
+
+@local_only
+@pytest.mark.skipif(shutil.which("go") is None, reason="go is not installed")
+def test_local_backend_runs_go_program_from_stdin(app, go_cache_dir):
+    """Go in source mode runs the input independent program with every input on stdin.
+
+    The cache starts cold, and building the standard library into it does not count
+    against the suite's time limit.
+    """
+    app.config.update({**LOCAL_CONFIG, "CODE_EXECUTION_CACHE": "none",
+                       "CODE_EXECUTION_GO_MODE": "source", "CODE_EXECUTION_GO_CACHE_DIR": go_cache_dir})
+    code = "func twoSum(nums []int, target int) []int {\n    return []int{len(nums), target}\n}"
+    results = execute_code_with_tests(code, ['{"nums": [2, 7], "target": 9}', '{"nums": [1], "target": 2}'],
+                                      "twoSum", "go")
+    assert [r["output"] for r in results] == [[2, 9], [1, 2]]
+
+@local_only
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_local_backend_runs_javascript():
+    """The local backend runs JavaScript with node when it is installed."""
+    output = make_local().run({"language": "javascript", "code": "console.log(1 + 1)",
+                                  "timeout": 5}, timeout=10)
+    assert output.strip() == "2"
+
+@local_only
+def test_local_backend_cpu_limit():
+    """Code that spins forever is stopped by the CPU time limit."""
+    with pytest.raises(ExecutionBackendError, match="Time limit exceeded"):
+        make_local().run({"language": "python", "code": "while True: pass", "timeout": 1},
+                            timeout=5)
+
+@local_only
+def test_local_backend_wall_clock_limit():
+    """Code that sleeps past the wall-clock timeout is killed."""
+    with pytest.raises(ExecutionBackendError, match="Time limit exceeded after 1 seconds"):
+        make_local().run({"language": "python", "code": "import time\ntime.sleep(30)",
+                             "timeout": 5}, timeout=1)
+
+@local_only
+def test_local_backend_memory_limit():
+    """Python submissions cannot allocate beyond the memory limit."""
+    output = make_local(memory_mb=128).run(
+        {"language": "python", "code": "x = 'a' * (10 ** 9)", "timeout": 5}, timeout=10)
+    assert "MemoryError" in output
+
+@local_only
+def test_local_backend_limits_processes():
+    """Subprocess and forked Python runs both get the process count limit, set without preexec_fn."""
+    code = "import resource\nprint(resource.getrlimit(resource.RLIMIT_NPROC))"
+    payload = {"language": "python", "code": code, "timeout": 5}
+    with patch("subprocess.Popen", wraps=subprocess.Popen) as popen:
+        output = make_local(max_processes=64).run(payload, timeout=10)
+    assert output.strip() == "(64, 64)"
+    assert "preexec_fn" not in popen.call_args.kwargs
+
+    pool = PythonWorkerPool(size=1)
+    try:
+        output = make_local(python_pool=pool, max_processes=32).run(payload, timeout=10)
+    finally:
+        pool.close()
+    assert output.strip() == "(32, 32)"
+
+def test_local_backend_unknown_language():
+    """Languages without a local toolchain are reported as unavailable."""
+    with pytest.raises(ExecutionBackendError):
+        make_local().run({"language": "rust", "code": "", "timeout": 1}, timeout=1)
+
+@local_only
+def test_python_worker_pool_runs_and_recycles():
+    """Warm workers run submissions and are replaced after max_tasks runs."""
+    pool = PythonWorkerPool(size=1, max_tasks=2)
+    local = make_local(python_pool=pool)
+    try:
+        first_server = pool._idle.queue[0]
+        outputs = [local.run({"language": "python", "code": f"print({i} * 2)", "timeout": 5},
+                             timeout=10) for i in range(3)]
+        assert outputs == ["0\n", "2\n", "4\n"]
+        assert pool._idle.queue[0] is not first_server
+    finally:
+        pool.close()
+
+@local_only
+def test_python_worker_pool_reports_errors_and_limits():
+    """Forked children report tracebacks and are held to the CPU limit."""
+    pool = PythonWorkerPool(size=1)
+    local = make_local(python_pool=pool)
+    try:
+        output = local.run({"language": "python", "code": "raise ValueError('bad')", "timeout": 5},
+                           timeout=10)
+        assert "ValueError: bad" in output
+        assert "python_fork_server" not in output
+
+        with pytest.raises(ExecutionBackendError, match="Time limit exceeded"):
+            local.run({"language": "python", "code": "while True: pass", "timeout": 1}, timeout=5)
+    finally:
+        pool.close()
+
+def test_compiled_program_cache_builds_once(tmp_path):
+    """A source is built once, and the least recently used binaries beyond the limit are pruned."""
+    builds = []
+
+    def build(source, path):
+        builds.append(source)
+        with open(path, "w", encoding="utf-8") as binary:
+            binary.write(source)
+
+    cache = CompiledProgramCache(str(tmp_path), max_entries=1)
+    first = cache.get_or_build("one", build)
+    assert cache.get_or_build("one", build) == first
+    assert builds == ["one"]
+
+    cache.get_or_build("two", build)
+    assert not os.path.exists(first)
+    assert len(os.listdir(tmp_path)) == 1
+
+@local_only
+def test_compiled_program_cache_directory_is_private(tmp_path):
+    """The binary directory is created with mode 0700, and one others can write to is refused."""
+    CompiledProgramCache(str(tmp_path / "binaries"))
+    assert os.stat(tmp_path / "binaries").st_mode & 0o777 == 0o700
+
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    os.chmod(shared, 0o777)
+    with pytest.raises(PermissionError, match="writable by other users"):
+        CompiledProgramCache(str(shared))
+
+@local_only
+@pytest.mark.skipif(shutil.which("go") is None, reason="go is not installed")
+def test_local_backend_runs_compiled_go(app, tmp_path, go_cache_dir):
+    """Go submissions are built once and the binary is run for each test input."""
+    app.config.update({**LOCAL_CONFIG, "CODE_EXECUTION_CACHE": "none",
+                       "CODE_EXECUTION_GO_BINARY_DIR": str(tmp_path),
+                       "CODE_EXECUTION_GO_CACHE_DIR": go_cache_dir})
+    code = "func twoSum(nums []int, target int) []int {\n    fmt.Println(target)\n    return []int{0, len(nums)}\n}"
+    inputs = ['{"nums": [2, 7], "target": 9}', '{"nums": [1], "target": 2}']
+
+    results = execute_code_with_tests(code, inputs, "twoSum", "go")
+    assert [r["output"] for r in results] == [[0, 2], [0, 1]]
+    assert results[0]["stdout"] == ["9"]
+    assert len(os.listdir(tmp_path)) == 1
+
+    with patch.object(LocalExecutor, "_build_go") as mock_build:
+        execute_code_with_tests(code, inputs[:1], "twoSum", "go")
+    mock_build.assert_not_called()
+
+@local_only
+def test_stub_runner_serves_suite_payloads(app):
+    """Suite payloads round trip through the stub runner, one run per input."""
+    app.config.update({"CODE_EXECUTOR_PAYLOAD_FORMAT": "suite", "CODE_EXECUTION_CACHE": "none"})
+    stub = create_stub_app(make_local()).test_client()
+
+    def post_to_stub(url, timeout, data, headers):
+        response = stub.post("/run", data=data, headers=headers)
+        return MagicMock(status_code=response.status_code, text=response.get_data(as_text=True),
+                         json=response.get_json)
+
+    code = "class Solution:\n    def sumArray(self, arr):\n        return sum(arr)"
+    with patch.object(get_executor_client().session, "post", side_effect=post_to_stub) as mock_post:
+        results = execute_code_with_tests(code, ["[1, 2, 3]", "[4, 5]", "[]"], "sumArray", "python")
+        single = execute_code_with_test(code, "[7]", "sumArray", "python")
+
+    assert [r["output"] for r in results] == [6, 9, 0]
+    assert single["output"] == 7
+    assert mock_post.call_count == 2
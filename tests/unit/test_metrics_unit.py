@@ -0,0 +1,47 @@
+"""Unit tests for the execution pipeline metrics."""
+import json
+import os
+import pytest
+from website.metrics import ERRORS_TOTAL, PHASE_SECONDS, MetricsRegistry
+
+def test_render_prometheus_text():
+    """Counters and cumulative histogram buckets are rendered in the Prometheus text format."""
+    registry = MetricsRegistry()
+    labels = {"phase": "format", "language": "python", "endpoint": "run_code_samples"}
+    registry.observe(PHASE_SECONDS, labels, 0.002)
+    registry.observe(PHASE_SECONDS, labels, 0.3)
+    registry.increment(ERRORS_TOTAL, {"type": "timeout", "language": "go", "endpoint": 'say "hi"'})
+
+    text = registry.render()
+    assert "# TYPE devready_execution_phase_seconds histogram" in text
+    series = 'endpoint="run_code_samples",language="python",phase="format"'
+    assert f'devready_execution_phase_seconds_bucket{{{series},le="0.001"}} 0' in text
+    assert f'devready_execution_phase_seconds_bucket{{{series},le="0.0025"}} 1' in text
+    assert f'devready_execution_phase_seconds_bucket{{{series},le="0.5"}} 2' in text
+    assert f'devready_execution_phase_seconds_bucket{{{series},le="+Inf"}} 2' in text
+    assert f"devready_execution_phase_seconds_count{{{series}}} 2" in text
+    assert 'devready_execution_errors_total{endpoint="say \\"hi\\"",language="go",type="timeout"} 1' in text
+
+def test_render_merges_every_worker(tmp_path):
+    """Snapshots written by other workers are added to this worker's own metrics."""
+    labels = {"type": "non_200", "language": "python", "endpoint": "submit_solution"}
+    other = MetricsRegistry()
+    other.increment(ERRORS_TOTAL, labels, 3)
+    other.observe(PHASE_SECONDS, {"phase": "compare"}, 0.02)
+    (tmp_path / "1.json").write_text(json.dumps(other.snapshot()))
+    (tmp_path / "2.json.tmp").write_text("partial")
+
+    registry = MetricsRegistry(str(tmp_path), flush_interval=3600)
+    registry.increment(ERRORS_TOTAL, labels)
+    registry.observe(PHASE_SECONDS, {"phase": "compare"}, 0.02)
+
+    text = registry.render()
+    assert 'devready_execution_errors_total{endpoint="submit_solution",language="python",type="non_200"} 4' in text
+    assert 'devready_execution_phase_seconds_count{phase="compare"} 2' in text
+    assert os.path.exists(tmp_path / f"{os.getpid()}.json")
+
+def test_registry_refuses_a_shared_directory(tmp_path):
+    """Snapshots could be planted in a directory others can write to, so it is not used."""
+    os.chmod(tmp_path, 0o777)
+    with pytest.raises(PermissionError, match="writable by other users"):
+        MetricsRegistry(str(tmp_path))
@@ -0,0 +1,71 @@
+"""Unit tests for the database migrations."""
+import os
+import pytest
+from flask_migrate import upgrade
+from website import create_app, db
+from website.models import Question, Submission, SubmissionJob, User, UserQuestionProgress
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), "..", "..", "migrations")
+
+@pytest.fixture
+def file_app(tmp_path):
+    """Create an app on a database file, as migrations run against a real database."""
+    testing_app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'devready.db'}",
+        'SECRET_KEY': 'test'
+    })
+    with testing_app.app_context():
+        yield testing_app
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.mark.usefixtures("file_app")
+def test_exact_runtimes_are_restored_from_jobs():
+    """Rounded runtimes are replaced by their job's exact runtime, and best runtimes follow."""
+    user = User(username="coder", email="coder@example.com", passwordHash="hashed")
+    question = Question(title="Two Sum", description="Add them", difficulty="Easy")
+    db.session.add_all([user, question])
+    db.session.commit()
+    submission = Submission(userID=user.userID, questionID=question.questionID, code="code",
+                            result="Passed", runtime=0, language="python")
+    db.session.add(submission)
+    db.session.commit()
+    db.session.add_all([
+        SubmissionJob(jobID="job", userID=user.userID, questionID=question.questionID, code="code",
+                      language="python", runtime=0.4, submissionID=submission.submissionID),
+        UserQuestionProgress(userID=user.userID, questionID=question.questionID, passed=True,
+                             attempts=1, bestRuntime=0)
+    ])
+    db.session.commit()
+
+    upgrade(directory=MIGRATIONS)
+    db.session.expire_all()
+
+    assert db.session.get(Submission, submission.submissionID).runtime == 0.4
+    progress = db.session.get(UserQuestionProgress, (user.userID, question.questionID))
+    assert progress.bestRuntime == 0.4
+
+@pytest.mark.usefixtures("file_app")
+def test_question_progress_is_backfilled():
+    """Submissions saved before progress rows were kept get their rows, with the best
+    runtime's language and the latest pass."""
+    user = User(username="coder", email="coder@example.com", passwordHash="hashed")
+    question = Question(title="Two Sum", description="Add them", difficulty="Easy")
+    db.session.add_all([user, question])
+    db.session.commit()
+    submissions = [Submission(userID=user.userID, questionID=question.questionID, code=code,
+                              result=result, runtime=runtime, language=language)
+                   for code, result, runtime, language in [("a", "Failed", None, "python"),
+                                                           ("b", "Passed", 3.5, "go"),
+                                                           ("c", "Passed", 8.0, "python")]]
+    db.session.add_all(submissions)
+    db.session.commit()
+
+    upgrade(directory=MIGRATIONS)
+    db.session.expire_all()
+
+    progress = db.session.get(UserQuestionProgress, (user.userID, question.questionID))
+    assert (progress.attempts, progress.passed) == (3, True)
+    assert (progress.bestRuntime, progress.bestRuntimeLanguage) == (3.5, "go")
+    assert progress.lastPassedSubmissionID == submissions[2].submissionID
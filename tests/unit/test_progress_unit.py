@@ -0,0 +1,110 @@
+"""Unit tests for per-user question progress."""
+from datetime import datetime
+from website.code_execution import record_submission
+from website.extensions import db
+from website.models import Question, Submission, User, UserQuestionProgress
+from website.progress import backfill_progress, has_passed, passed_question_ids, record_progress, solved_count
+from website.questions import get_latest_passed_submission_id, get_runtime_rank
+from website.runtime_ranking import record_runtime
+
+def add_user_and_question():
+    """Adds a user and a question and returns their IDs."""
+    user = User(username="coder", email="coder@example.com", passwordHash="hashed")
+    question = Question(title="Two Sum", description="Add them", difficulty="Easy")
+    db.session.add_all([user, question])
+    db.session.commit()
+    return user.userID, question.questionID
+
+def add_submission(user_id, question_id, result, runtime, time, language="python"):
+    """Adds a submission and counts it towards the user's progress, returning its ID."""
+    submission = Submission(userID=user_id, questionID=question_id, code="code", result=result,
+                            runtime=runtime, language=language, time=time)
+    db.session.add(submission)
+    db.session.flush()
+    record_progress(submission)
+    return submission.submissionID
+
+def test_record_progress_upserts_one_row(app):
+    """Attempts add up, a pass sticks, and the first pass, best runtime and latest pass are kept."""
+    with app.app_context():
+        user_id, question_id = add_user_and_question()
+        add_submission(user_id, question_id, "Failed", None, datetime(2024, 1, 1))
+        assert not has_passed(user_id, question_id)
+
+        add_submission(user_id, question_id, "Passed", 40, datetime(2024, 1, 2))
+        add_submission(user_id, question_id, "Passed", 25, datetime(2024, 1, 3), "go")
+        add_submission(user_id, question_id, "Failed", None, datetime(2024, 1, 4))
+        latest = add_submission(user_id, question_id, "Passed", 30, datetime(2024, 1, 5))
+        db.session.commit()
+
+        progress = db.session.get(UserQuestionProgress, (user_id, question_id))
+        assert progress.attempts == 5
+        assert progress.passed
+        assert progress.firstPassedAt == datetime(2024, 1, 2)
+        assert (progress.bestRuntime, progress.bestRuntimeLanguage) == (25, "go")
+        assert progress.lastPassedSubmissionID == latest
+        assert has_passed(user_id, question_id)
+        assert passed_question_ids(user_id) == {question_id}
+        assert solved_count(user_id) == 1
+
+def test_latest_pass_and_runtime_rank_are_read_from_progress(app):
+    """The latest passing submission and the runtime rank come from progress rows alone."""
+    with app.app_context():
+        user_id, question_id = add_user_and_question()
+        latest = add_submission(user_id, question_id, "Passed", 4.5, datetime(2024, 1, 1))
+        record_runtime(question_id, "python", 4.5)
+        record_runtime(question_id, "python", 9.0)
+        db.session.commit()
+        # Submissions are not consulted, as their rows are left out of both queries
+        Submission.query.delete()
+
+        assert get_latest_passed_submission_id(user_id) == latest
+        assert get_runtime_rank(user_id, question_id) == {
+            "runtime": 4.5, "language": "python", "fasterThan": 100.0}
+
+def test_record_submission_records_progress(app):
+    """Saving a submission counts it towards the user's progress."""
+    with app.app_context():
+        user_id, question_id = add_user_and_question()
+        record_submission(user_id, question_id, "pass", "python", [], False)
+        db.session.commit()
+
+        progress = db.session.get(UserQuestionProgress, (user_id, question_id))
+        assert progress.attempts == 1
+        assert not progress.passed
+
+def test_backfill_rebuilds_progress_from_submissions(app):
+    """Backfilling summarizes existing submissions and can be run again safely."""
+    with app.app_context():
+        user_id, question_id = add_user_and_question()
+        db.session.add_all([
+            Submission(userID=user_id, questionID=question_id, code="a", language="python",
+                       result="Failed", time=datetime(2024, 1, 1)),
+            Submission(userID=user_id, questionID=question_id, code="b", language="python",
+                       result="Passed", runtime=50, time=datetime(2024, 1, 2)),
+            Submission(userID=user_id, questionID=question_id, code="c", language="go",
+                       result="Passed", runtime=20, time=datetime(2024, 1, 3))
+        ])
+        db.session.commit()
+
+        assert backfill_progress() == 1
+        assert backfill_progress() == 1
+        db.session.commit()
+
+        progress = db.session.get(UserQuestionProgress, (user_id, question_id))
+        assert (progress.attempts, progress.passed, progress.bestRuntime) == (3, True, 20)
+        assert (progress.bestRuntimeLanguage, progress.firstPassedAt) == ("go", datetime(2024, 1, 2))
+        assert progress.lastPassedSubmissionID == Submission.query.filter_by(code="c").one().submissionID
+
+def test_backfill_command(app):
+    """The CLI command backfills progress and reports the number of rows."""
+    with app.app_context():
+        user_id, question_id = add_user_and_question()
+        db.session.add(Submission(userID=user_id, questionID=question_id, code="a",
+                                  language="python", result="Passed"))
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["backfill-question-progress"])
+    assert "Backfilled progress for 1 user questions" in result.output
+    with app.app_context():
+        assert has_passed(user_id, question_id)
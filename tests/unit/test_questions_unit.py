@@ -72,9 +72,9 @@ def test_get_all_tags_with_questions(app):
         assert len(tag_questions["strings"]) == 1  # One question under 'strings'
 
         # Check if correct questions are retrieved
-        assert any(q.title == "Sum Array" for q in tag_questions["arrays"])
-        assert any(q.title == "Reverse String" for q in tag_questions["arrays"])
-        assert tag_questions["strings"][0].title == "Reverse String"
+        assert any(q["title"] == "Sum Array" for q in tag_questions["arrays"])
+        assert any(q["title"] == "Reverse String" for q in tag_questions["arrays"])
+        assert tag_questions["strings"][0]["title"] == "Reverse String"
 
 @pytest.mark.usefixtures("sample_data")
 def test_get_all_completed_questions(app):
@@ -0,0 +1,55 @@
+"""Unit tests for the per-question runtime distribution."""
+from website.code_execution import record_submission
+from website.extensions import db
+from website.models import Question, RuntimeBucket, Submission, User
+from website.questions import get_runtime_rank
+from website.runtime_ranking import record_and_rank, record_runtime, runtime_bucket, runtime_percentile
+
+def test_runtime_bucket_grows_with_runtime():
+    """Longer runtimes never land in an earlier bucket, and sub-microsecond runtimes share the first."""
+    assert runtime_bucket(0) == runtime_bucket(0.0005) == 0
+    buckets = [runtime_bucket(ms) for ms in (0.001, 0.01, 0.5, 1, 1.05, 20, 5000)]
+    assert buckets == sorted(buckets)
+    assert runtime_bucket(1) != runtime_bucket(2)
+
+def test_record_runtime_increments_one_bucket(app):
+    """Each recorded runtime adds one to its bucket for that question and language only."""
+    record_runtime(1, "python", 3.0)
+    record_runtime(1, "python", 3.01)
+    record_runtime(1, "go", 3.0)
+
+    bucket = runtime_bucket(3.0)
+    assert RuntimeBucket.query.filter_by(questionID=1, language="python", bucket=bucket).one().count == 2
+    assert RuntimeBucket.query.filter_by(questionID=1, language="go").one().count == 1
+
+def test_runtime_percentile_counts_slower_submissions(app):
+    """The percentile is the share of other submissions that were slower, with ties counted as half."""
+    for runtime in (1, 2, 4, 8):
+        record_runtime(1, "python", runtime)
+
+    assert runtime_percentile(1, "python", 1) == 100.0
+    assert runtime_percentile(1, "python", 8) == 0.0
+    assert runtime_percentile(1, "python", 4) == round(1 / 3 * 100, 1)
+    assert record_and_rank(1, "python", 2) == 62.5
+
+def test_first_submission_has_no_percentile(app):
+    """A lone submission, or one without a runtime, is not ranked."""
+    assert record_and_rank(1, "python", 5) is None
+    assert record_and_rank(1, "python", None) is None
+
+def test_sub_millisecond_runtimes_are_stored_and_ranked_exactly(app):
+    """Runtimes under a millisecond are not rounded to 0, so each ranks in its own bucket."""
+    question = Question(title="Two Sum", description="Add them", difficulty="Easy")
+    fast = User(username="fast", email="fast@example.com", passwordHash="hashed")
+    slow = User(username="slow", email="slow@example.com", passwordHash="hashed")
+    db.session.add_all([question, fast, slow])
+    db.session.commit()
+    for user, runtime in ((fast, 0.25), (slow, 0.75)):
+        record_submission(user.userID, question.questionID, "code", "python",
+                          [{"runtime": runtime, "memory": None}], True)
+    db.session.commit()
+
+    assert Submission.query.filter_by(userID=fast.userID).one().runtime == 0.25
+    assert get_runtime_rank(fast.userID, question.questionID) == {
+        "runtime": 0.25, "language": "python", "fasterThan": 100.0}
+    assert get_runtime_rank(slow.userID, question.questionID)["fasterThan"] == 0.0
@@ -6,13 +6,16 @@ from flask_login import LoginManager
 from flask_sqlalchemy import SQLAlchemy
 from .auth import auth_blueprint
 from .views import main_blueprint
-from .code_execution import code_exec_blueprint
-from .ai_helper import ai_helper_blueprint
+from .code_execution import code_exec_blueprint, check_execution_settings, EXECUTION_DEFAULTS
+from .ai_helper import ai_helper_blueprint, ANALYSIS_DEFAULTS
 from .questions import questions_blueprint
 from .settings import settings_blueprint
 from .abtest import ab_blueprint
+from .comparators import precompute_expected_outputs_command
+from .progress import backfill_question_progress_command
 from .models import User
-from .extensions import db
+from .extensions import cache, db, migrate
+from .catalog import ensure_catalog_version
 
 load_dotenv()
 
@@ -27,10 +30,18 @@ def create_app(test_config=None):
         app.config['SQLALCHEMY_DATABASE_URI'] = db_url or 'sqlite:///devready.db'
         app.config['OPENAI_API_KEY'] = os.environ.get('OPENAI_API_KEY')
         app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY')
+        app.config['CACHE_TYPE'] = os.environ.get('CACHE_TYPE', 'SimpleCache')
+        app.config['CACHE_DEFAULT_TIMEOUT'] = int(os.environ.get('CACHE_DEFAULT_TIMEOUT', 3600))
+        for name, default in {**EXECUTION_DEFAULTS, **ANALYSIS_DEFAULTS}.items():
+            app.config[name] = type(default)(os.environ.get(name, default))
     else:
         app.config.update(test_config)
+    check_execution_settings(app.config)
 
     db.init_app(app)
+    migrate.init_app(app, db)
+    app.config.setdefault('CACHE_TYPE', 'SimpleCache')
+    cache.init_app(app)
 
     login_manager = LoginManager(app)
     login_manager.login_view = 'auth.about'
@@ -46,7 +57,10 @@ def create_app(test_config=None):
     app.register_blueprint(questions_blueprint)
     app.register_blueprint(settings_blueprint)
     app.register_blueprint(ab_blueprint)
+    app.cli.add_command(precompute_expected_outputs_command)
+    app.cli.add_command(backfill_question_progress_command)
 
     with app.app_context():
         db.create_all()
+        ensure_catalog_version()
     return app
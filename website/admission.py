@@ -0,0 +1,159 @@
+"""Admission control for code execution requests.
+
+Every run or submit asks the process's AdmissionController for a ticket before any code
+is executed. At most `slots` tickets are held at once, each user may have at most
+`per_user_limit` requests running or waiting, and at most `queue_size` requests wait up
+to `queue_timeout` seconds for a free slot. Anything beyond that is rejected straight away
+with an estimate of when to retry, so a burst is answered quickly instead of tying up
+every web worker. With a `queue_timeout` of 0 nothing waits, since a waiting request holds
+a synchronous worker: requests find a free slot or are rejected at once.
+
+The controller only sees its own process. Each gunicorn worker has its own, so the limits
+apply per worker rather than to the whole server.
+
+Waiting requests are granted in weighted fair order: each is tagged with a virtual
+finish time of its user's previous finish (or the current virtual time, if later) plus
+its cost, the number of tests it runs. Lowest tags go first, so a user with many queued
+or expensive requests cannot starve a user with a single small one.
+"""
+import heapq
+import itertools
+import math
+import threading
+import time
+
+# Weight given to the latest hold time in the running estimate used for Retry-After
+HOLD_TIME_SMOOTHING = 0.2
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted now; retry_after is a hint in whole seconds."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class AdmissionTicket:
+    """A granted slot, released when the request's code has finished running.
+
+    Tickets are context managers, and release() may be called more than once so a slot
+    handed to a background thread can be released by whichever side finishes last.
+    """
+
+    def __init__(self, controller, user_id):
+        self.controller = controller
+        self.user_id = user_id
+        self.granted_at = time.monotonic()
+        self._released = False
+
+    def release(self):
+        """Returns the slot to the controller, granting it to the next waiting request."""
+        if not self._released:
+            self._released = True
+            self.controller._release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.release()
+
+class _Waiter:
+    """A request waiting for a slot."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.event = threading.Event()
+        self.granted = False
+        self.cancelled = False
+
+class AdmissionController:
+    """Bounds running and waiting code executions, sharing slots fairly between users."""
+
+    def __init__(self, slots, per_user_limit, queue_size, queue_timeout, initial_hold_time=1.0):
+        self.slots = slots
+        self.per_user_limit = per_user_limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._running = 0
+        self._waiting = 0
+        self._heap = []
+        self._order = itertools.count()
+        self._in_flight = {}
+        self._finish_tags = {}
+        self._virtual_time = 0.0
+        self._mean_hold_time = initial_hold_time
+
+    def admit(self, user_id, cost=1):
+        """Waits up to queue_timeout for a slot and returns its ticket, or raises
+        AdmissionRejected."""
+        with self._lock:
+            if self._in_flight.get(user_id, 0) >= self.per_user_limit:
+                raise AdmissionRejected(
+                    "You already have code running, please wait for it to finish",
+                    self._retry_after(0))
+            if self._running >= self.slots or self._waiting:
+                if self._waiting >= self.queue_size or self.queue_timeout <= 0:
+                    raise AdmissionRejected("The code runner is busy, please try again shortly",
+                                            self._retry_after(self._waiting))
+
+            start = max(self._virtual_time, self._finish_tags.get(user_id, 0.0))
+            self._finish_tags[user_id] = start + max(1, cost)
+            self._in_flight[user_id] = self._in_flight.get(user_id, 0) + 1
+
+            if self._running < self.slots and not self._waiting:
+                self._running += 1
+                self._virtual_time = start
+                return AdmissionTicket(self, user_id)
+
+            waiter = _Waiter(user_id)
+            heapq.heappush(self._heap, (self._finish_tags[user_id], next(self._order), start, waiter))
+            self._waiting += 1
+
+        waiter.event.wait(self.queue_timeout)
+        with self._lock:
+            if not waiter.granted:
+                # Left in the heap and skipped when it reaches the top
+                waiter.cancelled = True
+                self._waiting -= 1
+                self._forget(user_id)
+                raise AdmissionRejected("The code runner is busy, please try again shortly",
+                                        self._retry_after(self._waiting))
+        return AdmissionTicket(self, user_id)
+
+    def stats(self):
+        """Returns the numbers of running and waiting requests."""
+        with self._lock:
+            return {"running": self._running, "waiting": self._waiting}
+
+    def _release(self, ticket):
+        with self._lock:
+            held = time.monotonic() - ticket.granted_at
+            self._mean_hold_time += HOLD_TIME_SMOOTHING * (held - self._mean_hold_time)
+            self._running -= 1
+            self._forget(ticket.user_id)
+            self._grant_waiters()
+
+    def _grant_waiters(self):
+        while self._heap and self._running < self.slots:
+            _, _, start, waiter = heapq.heappop(self._heap)
+            if waiter.cancelled:
+                continue
+            waiter.granted = True
+            self._waiting -= 1
+            self._running += 1
+            self._virtual_time = max(self._virtual_time, start)
+            waiter.event.set()
+
+    def _forget(self, user_id):
+        remaining = self._in_flight[user_id] - 1
+        if remaining:
+            self._in_flight[user_id] = remaining
+        else:
+            # Users with nothing in flight start again from the current virtual time
+            del self._in_flight[user_id]
+            self._finish_tags.pop(user_id, None)
+
+    def _retry_after(self, ahead):
+        # Time for the requests ahead, and one more, to pass through the slots
+        return max(1, math.ceil(self._mean_hold_time * (ahead / self.slots + 1)))
@@ -1,11 +1,63 @@
 """Blueprint for AI-powered coding hints and analysis."""
 import json
+import threading
 
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, jsonify, request, current_app, has_app_context
 from openai import OpenAI
+from website.code_execution import normalize_language
+from website.code_normalization import code_fingerprints
+from website.directories import default_state_directory
+from website.execution_cache import build_cache, execution_cache_key
 
 ai_helper_blueprint = Blueprint("ai_helper", __name__)
 
+# Defaults for the complexity analysis cache, overridable through the app config. It is
+# kept apart from the execution result cache, so analyses, which are few but costly to
+# redo, are not evicted by test results and get their own hit and miss counts
+ANALYSIS_DEFAULTS = {
+    # "memory" caches analyses per process, "filesystem" shares them between workers,
+    # "none" disables
+    "AI_ANALYSIS_CACHE": "memory",
+    # Private directory for the filesystem cache, defaulting to one per user under the system
+    # temp dir. It must be owned by the web server's user and writable by nobody else
+    "AI_ANALYSIS_CACHE_DIR": "",
+    # Seconds a cached analysis stays valid and the most bytes the cache may hold
+    "AI_ANALYSIS_CACHE_TTL": 7 * 24 * 3600,
+    "AI_ANALYSIS_CACHE_MAX_BYTES": 8 * 1024 * 1024
+}
+
+# Complexity analysis cache shared by every thread in this process
+_analysis_cache = None
+_analysis_cache_lock = threading.Lock()
+
+def get_analysis_setting(name):
+    """Returns an analysis setting from the app config, or its default outside the app."""
+    if has_app_context():
+        return current_app.config.get(name, ANALYSIS_DEFAULTS[name])
+    return ANALYSIS_DEFAULTS[name]
+
+def get_analysis_cache():
+    """Returns the process-wide complexity analysis cache, or None if caching is disabled."""
+    global _analysis_cache
+    kind = get_analysis_setting("AI_ANALYSIS_CACHE")
+    if kind == "none":
+        return None
+    with _analysis_cache_lock:
+        if _analysis_cache is None:
+            _analysis_cache = build_cache(
+                kind,
+                get_analysis_setting("AI_ANALYSIS_CACHE_DIR")
+                or default_state_directory("devready-analysis-cache"),
+                get_analysis_setting("AI_ANALYSIS_CACHE_MAX_BYTES"),
+                get_analysis_setting("AI_ANALYSIS_CACHE_TTL"))
+        return _analysis_cache
+
+def reset_analysis_cache():
+    """Discards the process-wide analysis cache so the next call builds a fresh one."""
+    global _analysis_cache
+    with _analysis_cache_lock:
+        _analysis_cache = None
+
 def get_openai_client():
     """Retrieves OpenAI client using the API key from Flask config."""
     api_key = current_app.config.get("OPENAI_API_KEY")
@@ -13,6 +65,11 @@ def get_openai_client():
         raise ValueError("Missing OpenAI API Key")
     return OpenAI(api_key=api_key, base_url="https://api.deepseek.com")
 
+def analysis_cache_key(code, language, question_description):
+    """Returns the cache key of a complexity analysis, shared by cosmetically different code."""
+    canonical, _ = code_fingerprints(code, language)
+    return execution_cache_key("analysis", canonical, question_description)
+
 def generate_response(system_prompt, user_prompt):
     """Helper function to generate AI responses using DeepSeek Chat API."""
     try:
@@ -63,10 +120,17 @@ def analyze_submission():
     data = request.get_json()
     code = data.get("code")
     question_description = data.get("question_description")
+    language = normalize_language(data.get("language", "python"))
 
     if not question_description or not code:
         return jsonify({"success": False, "error": "Missing question description or code"}), 400
 
+    cache = get_analysis_cache()
+    key = analysis_cache_key(code, language, question_description)
+    cached = cache.get(key) if cache else None
+    if cached is not None:
+        return jsonify({"success": True, "analysis": cached})
+
     system_prompt = (
         "You are a CS professor specializing in algorithms."
         "You perfectly analyze student algorithm submission against their known optimal worst-case time complexity"
@@ -119,4 +183,7 @@ def analyze_submission():
         return jsonify({"success": False, "error": "Failed to parse complexity analysis"}), 500
     except Exception as e:
         return jsonify({"success": False, "error": f"Error processing analysis: {str(e)}"}), 500
+
+    if cache:
+        cache.set(key, response)
     return jsonify({"success": True, "analysis": response})
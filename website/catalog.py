@@ -0,0 +1,112 @@
+"""Versioned cache of the serialized question catalog.
+
+The catalog (questions, tags and test cases) changes rarely but is read on every library
+and question list request. Serialized copies are kept in the Flask-Caching cache under
+the catalog's version, a counter stored in the database. Every flush that writes a
+catalog row bumps the counter in the same transaction, so once it commits every gunicorn
+worker reads the new version, misses the cache and rebuilds its copy. Copies of old
+versions are never read again and age out of the cache.
+
+The version also seeds strong ETags, so a client polling an unchanged catalog is
+answered 304 Not Modified after reading the version and nothing else.
+
+Writes that bypass the ORM session, such as raw SQL, do not bump the version.
+"""
+import functools
+import hashlib
+import os
+from flask import current_app, make_response, request
+from sqlalchemy import event, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from website.extensions import cache, db
+from website.models import CatalogVersion, Question, QuestionTag, Tag, TestCase
+
+# Rows whose changes alter the cached catalog
+CATALOG_MODELS = (Question, QuestionTag, Tag, TestCase)
+
+# Primary key of the single catalog version row
+CATALOG_VERSION_ID = 1
+
+# Listings are the same for every signed-in user, so shared caches may store them, but
+# every reuse is revalidated so the login check still runs
+SHARED_CACHE_CONTROL = "public, no-cache"
+
+# Pages that show the user's own progress are only stored by their browser
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+def ensure_catalog_version():
+    """Creates the catalog version row if the database does not have it yet."""
+    if db.session.get(CatalogVersion, CATALOG_VERSION_ID) is not None:
+        return
+    try:
+        db.session.add(CatalogVersion(id=CATALOG_VERSION_ID, version=0))
+        db.session.commit()
+    except IntegrityError:
+        # Another worker created it first
+        db.session.rollback()
+
+def catalog_version():
+    """Returns the current catalog version."""
+    return db.session.execute(
+        select(CatalogVersion.version).where(CatalogVersion.id == CATALOG_VERSION_ID)
+    ).scalar() or 0
+
+def touches_catalog(session):
+    """Returns True if the session's pending changes add, change or delete a catalog row."""
+    if any(isinstance(obj, CATALOG_MODELS) for obj in session.new | session.deleted):
+        return True
+    # Collections changed through backrefs, such as a question's new submission, are not catalog edits
+    return any(isinstance(obj, CATALOG_MODELS) and session.is_modified(obj, include_collections=False)
+               for obj in session.dirty)
+
+@event.listens_for(Session, "after_flush")
+def bump_catalog_version(session, flush_context):
+    """Increments the catalog version in the transaction that wrote catalog rows."""
+    if touches_catalog(session):
+        session.connection().execute(
+            update(CatalogVersion.__table__)
+            .where(CatalogVersion.__table__.c.id == CATALOG_VERSION_ID)
+            .values(version=CatalogVersion.__table__.c.version + 1)
+        )
+
+def cached_catalog(name, build, version=None):
+    """Returns the catalog data called name for version, or the current one, building it on a miss."""
+    # Read the version first, so the data is never older than the version it is cached under
+    key = f"catalog:{catalog_version() if version is None else version}:{name}"
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data)
+    return data
+
+@functools.lru_cache(maxsize=None)
+def _templates_fingerprint(directory):
+    digest = hashlib.sha256()
+    for root, _, files in sorted(os.walk(directory)):
+        for name in sorted(files):
+            with open(os.path.join(root, name), "rb") as template:
+                digest.update(name.encode("utf-8") + template.read())
+    return digest.hexdigest()
+
+def templates_fingerprint():
+    """Returns a digest of the app's templates, so pages rendered by another release get new ETags."""
+    return _templates_fingerprint(os.path.join(current_app.root_path, current_app.template_folder))
+
+def catalog_etag(version, *parts):
+    """Returns a strong ETag for a response built from a catalog version and parts."""
+    token = ":".join(str(part) for part in (version, *parts))
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def not_modified(etag, cache_control):
+    """Returns a 304 response if the request already holds etag, otherwise None."""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = make_response("", 304)
+    return with_validators(response, etag, cache_control)
+
+def with_validators(response, etag, cache_control):
+    """Sets the ETag and Cache-Control headers of response and returns it."""
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    return response
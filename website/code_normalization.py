@@ -0,0 +1,203 @@
+"""Canonical forms of submitted code, so cosmetic edits map to the same cache entries.
+
+Python is parsed and unparsed, which drops comments, docstrings and formatting.
+JavaScript, TypeScript and Go are tokenized: comments are dropped and every run of
+whitespace becomes a single space, or a single newline if it held one, because newlines
+end statements in all three. String, template and regular expression literals are kept
+verbatim. Code that cannot be normalized safely is left as it is, which only costs a
+cache miss.
+"""
+import ast
+import functools
+import hashlib
+import re
+
+# Bumped whenever normalization changes, so old fingerprints stop matching
+NORMALIZATION_VERSION = 1
+
+# Identifiers, numbers and the longest punctuators first; anything else is one character
+C_LIKE_TOKEN = re.compile(r"[A-Za-z0-9_$.]+|>>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|&&=|\|\|=|\?\?=|"
+                          r"=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.|\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|"
+                          r"<<|>>|\*\*|:=|<-|&\^=|&\^|.", re.DOTALL)
+
+# Tokens after which a slash starts a regular expression rather than a division
+REGEX_PRECEDING_WORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+                         "throw", "case", "do", "else", "yield", "await"}
+
+class NormalizationError(Exception):
+    """Raised when code cannot be normalized without risking a change in meaning."""
+
+def strip_docstrings(tree):
+    """Removes the docstrings of a module and of every class and function in it."""
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if (body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant)
+                    and isinstance(body[0].value.value, str)):
+                node.body = body[1:] or ([ast.Pass()] if not isinstance(node, ast.Module) else [])
+    return tree
+
+def normalize_python(code):
+    """Returns Python code unparsed from its syntax tree, without comments or docstrings."""
+    try:
+        return ast.unparse(strip_docstrings(ast.parse(code)))
+    except (SyntaxError, ValueError, RecursionError) as e:
+        raise NormalizationError(str(e)) from e
+
+def _scan_quoted(code, start, quote):
+    # Returns the index after a string literal, which may not span lines unescaped
+    index = start + 1
+    while index < len(code):
+        char = code[index]
+        if char == "\\":
+            index += 2
+        elif char == quote:
+            return index + 1
+        elif char == "\n":
+            break
+        else:
+            index += 1
+    raise NormalizationError("Unterminated string literal")
+
+def _scan_template(code, start):
+    # Returns the index after a template literal, including any nested ${...} expressions
+    index = start + 1
+    while index < len(code):
+        if code[index] == "\\":
+            index += 2
+        elif code[index] == "`":
+            return index + 1
+        elif code.startswith("${", index):
+            index = _scan_template_expression(code, index + 2)
+        else:
+            index += 1
+    raise NormalizationError("Unterminated template literal")
+
+def _scan_template_expression(code, index):
+    depth = 1
+    while index < len(code):
+        char = code[index]
+        if char in "'\"":
+            index = _scan_quoted(code, index, char)
+        elif char == "`":
+            index = _scan_template(code, index)
+        elif code.startswith("//", index) or code.startswith("/*", index):
+            raise NormalizationError("Comment inside a template expression")
+        else:
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    return index + 1
+            index += 1
+    raise NormalizationError("Unterminated template expression")
+
+def _scan_regex(code, start):
+    # Returns the index after a regular expression literal and its flags
+    index = start + 1
+    in_class = False
+    while index < len(code):
+        char = code[index]
+        if char == "\\":
+            index += 2
+            continue
+        if char == "\n":
+            break
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            index += 1
+            while index < len(code) and (code[index].isalnum() or code[index] == "_"):
+                index += 1
+            return index
+        index += 1
+    raise NormalizationError("Unterminated regular expression")
+
+def _starts_regex(previous):
+    if previous is None:
+        return True
+    if previous == "}":
+        # A block or an object literal, so the slash could be either
+        raise NormalizationError("Ambiguous slash after a closing brace")
+    if previous in (")", "]"):
+        return False
+    if previous[0].isalnum() or previous[0] in "_$.":
+        return previous in REGEX_PRECEDING_WORDS
+    return True
+
+def normalize_c_like(code, language):
+    """Returns JavaScript, TypeScript or Go code without comments and with whitespace collapsed."""
+    pieces = []
+    previous = None
+    separator = ""
+    index = 0
+    while index < len(code):
+        char = code[index]
+        if char in " \t\r\f\v\n":
+            if char == "\n":
+                separator = "\n"
+            elif not separator:
+                separator = " "
+            index += 1
+            continue
+        if code.startswith("//", index):
+            end = code.find("\n", index)
+            index = len(code) if end == -1 else end
+            continue
+        if code.startswith("/*", index):
+            end = code.find("*/", index + 2)
+            if end == -1:
+                raise NormalizationError("Unterminated comment")
+            # A comment spanning lines still ends a statement
+            if "\n" in code[index:end]:
+                separator = "\n"
+            elif not separator:
+                separator = " "
+            index = end + 2
+            continue
+
+        if char in "'\"":
+            end = _scan_quoted(code, index, char)
+        elif char == "`" and language == "go":
+            # Go raw strings have no escapes
+            end = code.find("`", index + 1) + 1
+            if end == 0:
+                raise NormalizationError("Unterminated raw string")
+        elif char == "`":
+            end = _scan_template(code, index)
+        elif char == "/" and language != "go" and _starts_regex(previous):
+            end = _scan_regex(code, index)
+        else:
+            end = C_LIKE_TOKEN.match(code, index).end()
+
+        token = code[index:end]
+        if pieces and separator:
+            pieces.append(separator)
+        pieces.append(token)
+        previous = token
+        separator = ""
+        index = end
+    return "".join(pieces)
+
+@functools.lru_cache(maxsize=1024)
+def normalize_code(code, language):
+    """Returns the canonical form of code, or the code unchanged if it cannot be normalized."""
+    try:
+        if language == "python":
+            return normalize_python(code)
+        if language in ("javascript", "typescript", "go"):
+            return normalize_c_like(code, language)
+    except NormalizationError:
+        pass
+    return code
+
+@functools.lru_cache(maxsize=1024)
+def code_fingerprints(code, language):
+    """Returns (canonical, exact) hex digests of code, equal for cosmetically different
+    code and for identical code respectively."""
+    canonical = f"{NORMALIZATION_VERSION}:{language}:{normalize_code(code, language)}"
+    return (hashlib.sha256(canonical.encode("utf-8")).hexdigest(),
+            hashlib.sha256(code.encode("utf-8")).hexdigest())
@@ -0,0 +1,175 @@
+"""Comparison of test outputs with expected outputs.
+
+How a question's outputs are compared is data: a QuestionComparator row names one of the
+comparators below, and questions without one fall back to DEFAULT_COMPARATORS by method
+name. Expected outputs are reduced to a canonical JSON form when a test case is saved, so
+a submit only canonicalizes the user's output and compares two strings instead of parsing
+and re-sorting the expected value for every test.
+"""
+import functools
+import json
+import math
+import click
+from flask import has_app_context
+from flask.cli import with_appcontext
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from website.extensions import db
+from website.models import ExpectedOutput, Question, QuestionComparator, TestCase
+
+EXACT = "exact"
+UNORDERED = "unordered"  # A list whose order does not matter
+NESTED_UNORDERED = "nested_unordered"  # A list of lists where neither order matters
+FLOAT_TOLERANCE = "float_tolerance"  # Numbers equal within the question's tolerance
+LINKED_LIST = "linked_list"  # Linked lists, compared as the lists of their values
+
+COMPARATORS = (EXACT, UNORDERED, NESTED_UNORDERED, FLOAT_TOLERANCE, LINKED_LIST)
+
+# Comparators for questions that have no QuestionComparator row
+DEFAULT_COMPARATORS = {
+    "twoSum": UNORDERED,
+    "letterCombinations": UNORDERED,
+    "threeSum": NESTED_UNORDERED,
+    "fourSum": NESTED_UNORDERED,
+    "addTwoNumbers": LINKED_LIST,
+    "removeNthFromEnd": LINKED_LIST
+}
+
+DEFAULT_TOLERANCE = 1e-6
+
+def default_comparator(expected_method):
+    """Returns the comparator used for expected_method when its question does not name one."""
+    return DEFAULT_COMPARATORS.get(expected_method, EXACT)
+
+def get_comparator(question_id, expected_method):
+    """Returns the (comparator, tolerance) a question's outputs are compared with."""
+    if question_id is not None and has_app_context():
+        row = db.session.get(QuestionComparator, question_id)
+        if row is not None:
+            return row.comparator, row.tolerance if row.tolerance is not None else DEFAULT_TOLERANCE
+    return default_comparator(expected_method), DEFAULT_TOLERANCE
+
+def parse_expected(raw):
+    """Parses a stored expected output as JSON, keeping it as a plain string if it is not JSON."""
+    if not isinstance(raw, str):
+        return raw
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return raw
+
+def _sorted(values):
+    # Natural order where the values allow it, so displayed outputs read as before
+    try:
+        return sorted(values)
+    except TypeError:
+        return sorted(values, key=canonical_json)
+
+def _normalize_numbers(value):
+    # 2.0 and 2 compare equal, so they must also encode the same
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, list):
+        return [_normalize_numbers(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize_numbers(item) for key, item in value.items()}
+    return value
+
+def canonicalize(value, comparator):
+    """Returns value in the form outputs are compared in under comparator."""
+    if comparator in (UNORDERED, NESTED_UNORDERED):
+        # Missing results count as empty, as unordered questions have always treated them
+        value = value or []
+        if not isinstance(value, list):
+            return value
+        if comparator == NESTED_UNORDERED or (value and isinstance(value[0], list)):
+            value = [_sorted(item) if isinstance(item, list) else item for item in value]
+        return _sorted(value)
+    return value
+
+def canonical_json(value):
+    """Encodes a canonical value so equal values, and only those, give equal strings."""
+    return json.dumps(_normalize_numbers(value), sort_keys=True, separators=(",", ":"))
+
+def canonical_expected(raw_expected, comparator):
+    """Returns the canonical JSON of a stored expected output under comparator."""
+    return canonical_json(canonicalize(parse_expected(raw_expected), comparator))
+
+@functools.lru_cache(maxsize=1024)
+def _load_canonical(canonical):
+    return json.loads(canonical)
+
+def _close(output, expected, tolerance):
+    if isinstance(output, bool) or isinstance(expected, bool):
+        return output == expected
+    if isinstance(output, (int, float)) and isinstance(expected, (int, float)):
+        return math.isclose(output, expected, rel_tol=tolerance, abs_tol=tolerance)
+    if isinstance(output, list) and isinstance(expected, list):
+        return len(output) == len(expected) and all(
+            _close(o, e, tolerance) for o, e in zip(output, expected))
+    if isinstance(output, dict) and isinstance(expected, dict):
+        return output.keys() == expected.keys() and all(
+            _close(output[key], expected[key], tolerance) for key in output)
+    return output == expected
+
+def compare_output(output, expected_canonical, comparator, tolerance=DEFAULT_TOLERANCE):
+    """Compares a test's output with the canonical JSON of its expected output.
+
+    Returns (passed, output), where output is canonicalized for unordered comparators so
+    the user sees it in the order it was compared in.
+    """
+    output = canonicalize(output, comparator)
+    if comparator == FLOAT_TOLERANCE:
+        return _close(output, _load_canonical(expected_canonical), tolerance), output
+    return canonical_json(output) == expected_canonical, output
+
+def expected_canonical_for(test, comparator):
+    """Returns a test case's canonical expected output, from its precomputed row when it is current."""
+    expectation = getattr(test, "expectation", None)
+    if expectation is not None and expectation.comparator == comparator:
+        return expectation.canonical
+    return canonical_expected(test.expectedOutput, comparator)
+
+def refresh_expectation(test, comparator):
+    """Stores the canonical form of a test case's expected output for comparator."""
+    canonical = canonical_expected(test.expectedOutput, comparator)
+    if test.expectation is None:
+        test.expectation = ExpectedOutput(comparator=comparator, canonical=canonical)
+    else:
+        test.expectation.comparator = comparator
+        test.expectation.canonical = canonical
+
+def _test_comparator(session, test):
+    # Pending test cases may only have their questionID set, not the relationship
+    question = test.question or (session.get(Question, test.questionID) if test.questionID else None)
+    if question is None:
+        return None
+    row = session.get(QuestionComparator, question.questionID) if question.questionID else None
+    return row.comparator if row is not None else default_comparator(question.expected_method)
+
+@event.listens_for(Session, "before_flush")
+def precompute_expected_outputs(session, flush_context, instances):
+    """Canonicalizes expected outputs whenever test cases or question comparators are saved."""
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty):
+            if isinstance(obj, TestCase):
+                if obj not in session.new and not inspect(obj).attrs.expectedOutput.history.has_changes():
+                    continue
+                comparator = _test_comparator(session, obj)
+                if comparator is not None:
+                    refresh_expectation(obj, comparator)
+            elif isinstance(obj, QuestionComparator):
+                for test in session.query(TestCase).filter_by(questionID=obj.questionID):
+                    refresh_expectation(test, obj.comparator)
+
+@click.command("precompute-expected-outputs")
+@with_appcontext
+def precompute_expected_outputs_command():
+    """Canonicalizes the expected output of every saved test case."""
+    tests = TestCase.query.all()
+    for test in tests:
+        comparator = _test_comparator(db.session, test)
+        if comparator is not None:
+            refresh_expectation(test, comparator)
+    db.session.commit()
+    click.echo(f"Precomputed {len(tests)} expected outputs")
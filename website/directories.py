@@ -0,0 +1,48 @@
+"""Directories that the code execution pipeline keeps state in between requests.
+
+Compiled binaries, cached results and metrics snapshots are read back and trusted later,
+so the directories holding them must not be writable by anyone but their owner. The
+defaults live under the shared system temp directory, where another local user could
+create them first.
+"""
+import os
+import stat
+import tempfile
+
+def default_state_directory(name):
+    """Returns the default path under the system temp dir for state named name, per user."""
+    if not hasattr(os, "geteuid"):
+        return os.path.join(tempfile.gettempdir(), name)
+    return os.path.join(tempfile.gettempdir(), f"{name}-{os.geteuid()}")
+
+def ensure_private_directory(path, uid=None, gid=None):
+    """Creates path with mode 0700 if it is missing and checks that it is safe to use.
+
+    The directory must be a real directory, not a symlink, owned by uid (this process's
+    user by default) and writable by nobody else. Group and other read or search bits left
+    by an older version are removed. Raises PermissionError if the directory is unsafe.
+    """
+    if not hasattr(os, "geteuid"):
+        # Windows has no POSIX ownership or modes to check
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    uid = os.geteuid() if uid is None else uid
+    try:
+        os.makedirs(path, mode=0o700)
+    except FileExistsError:
+        pass
+    else:
+        if uid != os.geteuid():
+            os.chown(path, uid, os.getegid() if gid is None else gid)
+
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"{path} is not a directory")
+    if info.st_uid != uid:
+        raise PermissionError(f"{path} is owned by uid {info.st_uid}, expected uid {uid}")
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"{path} is writable by other users")
+    if stat.S_IMODE(info.st_mode) != 0o700:
+        os.chmod(path, 0o700)
+    return path
@@ -0,0 +1,196 @@
+"""Content-addressed cache of code execution results.
+
+Results are stored as JSON under a hash of everything that determines them, with a
+TTL and a total size cap enforced by evicting the least recently used entries. The
+in-process backend is private to one web worker; the filesystem backend lets every
+gunicorn worker on a machine share results.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from website.directories import ensure_private_directory
+
+def execution_cache_key(*parts):
+    """Returns a stable hex digest identifying the given JSON-serializable parts."""
+    encoded = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class MemoryCacheBackend:
+    """LRU cache held in this process's memory."""
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the stored bytes for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    def set(self, key, data):
+        """Stores bytes under key, evicting least recently used entries to stay under max_bytes."""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + self.ttl, data)
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        """Removes every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key):
+        _, data = self._entries.pop(key)
+        self._size -= len(data)
+
+class FileCacheBackend:
+    """LRU cache stored as files in a directory shared by every worker on the machine.
+
+    File modification times record last use. Writes are atomic renames, and the
+    directory is pruned back under max_bytes every prune_interval writes. Cached results
+    are served as if they had just run, so the directory must be private to this user.
+    """
+
+    def __init__(self, directory, max_bytes, ttl, prune_interval=50):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.prune_interval = prune_interval
+        self._writes = 0
+        self._lock = threading.Lock()
+        ensure_private_directory(directory)
+
+    def get(self, key):
+        """Returns the stored bytes for key, or None if missing or expired."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as entry_file:
+                expires_at = float(entry_file.readline())
+                data = entry_file.read()
+        except (OSError, ValueError):
+            return None
+        if expires_at <= time.time():
+            self._unlink(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def set(self, key, data):
+        """Stores bytes under key, pruning the directory every prune_interval writes."""
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as entry_file:
+                entry_file.write(f"{time.time() + self.ttl}\n".encode("ascii"))
+                entry_file.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            self._unlink(temp_path)
+            return
+
+        with self._lock:
+            self._writes += 1
+            should_prune = self._writes % self.prune_interval == 0
+        if should_prune:
+            self.prune()
+
+    def prune(self):
+        """Deletes expired entries, then the least recently used ones until under max_bytes."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        now = time.time()
+        for mtime, size, path in entries:
+            if total <= self.max_bytes and mtime + self.ttl > now:
+                break
+            self._unlink(path)
+            total -= size
+
+    def clear(self):
+        """Removes every entry."""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                self._unlink(os.path.join(root, name))
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+class ExecutionCache:
+    """Stores execution results in a backend and counts hits and misses."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the cached result for key, or None on a miss."""
+        data = self.backend.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return json.loads(data) if data is not None else None
+
+    def set(self, key, result):
+        """Caches a JSON-serializable result under key."""
+        self.backend.set(key, json.dumps(result).encode("utf-8"))
+
+    def stats(self):
+        """Returns this process's hit and miss counts."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+def build_cache(kind, directory, max_bytes, ttl):
+    """Returns an ExecutionCache on the backend kind names, "memory" or "filesystem" in
+    directory, or None for "none"."""
+    if kind == "none":
+        return None
+    if kind == "filesystem":
+        return ExecutionCache(FileCacheBackend(directory, max_bytes, ttl))
+    return ExecutionCache(MemoryCacheBackend(max_bytes, ttl))
@@ -0,0 +1,607 @@
+"""Backends that run formatted submissions for the code execution blueprint.
+
+Every backend exposes run(payload, timeout), where payload is the remote runner's
+{"language", "code", "timeout"} request body, and returns the program's output text.
+Failures that mean the code could not be run at all raise ExecutionBackendError.
+
+With the "suite" payload format, request bodies are gzip-compressed and a whole suite
+is one request: {"language", "code", "timeout", "inputs"} runs the shared program once
+per input, which it reads on stdin, and is answered with {"outputs": [{"output",
+"error"}, ...]}, one entry per input.
+"""
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import queue
+import random
+import select
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from website.directories import default_state_directory, ensure_private_directory
+
+FORK_SERVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "python_fork_server.py")
+SANDBOX_EXEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_exec.py")
+
+# Processes and threads the sandbox user may have at once, counted across every run
+DEFAULT_MAX_PROCESSES = 512
+
+# Exit status and stderr prefix of a run that sandbox_exec or the fork server could not
+# confine, in which case the submission never started
+SANDBOX_FAILED_STATUS = 126
+SANDBOX_FAILED_PREFIX = "Could not enter the sandbox:"
+
+# Seconds of CPU and wall-clock time allowed for building a Go binary
+GO_BUILD_TIMEOUT = 60
+
+# Gateway responses meaning the request never reached a runner, so sending it again is safe.
+# A 504 or 500 may come from code that is still running or already ran, and is not retried
+RETRYABLE_STATUS_CODES = (502, 503)
+
+# gzip level for suite payloads; the code and JSON inputs compress well even at low levels
+PAYLOAD_COMPRESSION_LEVEL = 5
+
+try:
+    import resource
+except ImportError:  # Windows has no rlimits, so only the remote backend is available there
+    resource = None
+
+class ExecutionBackendError(Exception):
+    """Raised when a backend could not run the submitted code."""
+
+class ExecutorUnavailableError(ExecutionBackendError):
+    """Raised when the circuit breaker is open and calls to the executor are skipped."""
+
+class CompilationError(ExecutionBackendError):
+    """Raised with the compiler output when submitted code does not build."""
+
+class ExecutionTimeoutError(ExecutionBackendError):
+    """Raised when code, or the request running it, hits a time limit."""
+
+class ExecutorResponseError(ExecutionBackendError):
+    """Raised when the executor answers with a status other than 200."""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+class MalformedResponseError(ExecutionBackendError):
+    """Raised when the executor answers 200 with a body that is not the expected JSON."""
+
+class ExecutorClient:
+    """Pooled, keep-alive client for the code executor with retries and a circuit breaker.
+
+    Connection and server errors are retried with jittered exponential backoff. After
+    failure_threshold consecutive failed calls the circuit opens and every call fails
+    fast until reset_timeout seconds have passed, when a single trial call is let through.
+    With payload_format "suite" the runner is sent compressed suite payloads.
+    """
+
+    def __init__(self, url, pool_size=10, max_retries=2, backoff_base=0.2, backoff_max=2.0,
+                 failure_threshold=5, reset_timeout=30, payload_format="json"):
+        self.url = url
+        self.payload_format = payload_format
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+        # Retries are handled here so they can use backoff and feed the circuit breaker
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def post(self, payload, timeout):
+        """Posts a JSON payload to the executor and returns the final response.
+
+        Connection errors, 502 and 503 are retried. Raises ExecutorUnavailableError
+        while the circuit is open, or the last requests.RequestException if every
+        attempt failed to connect.
+        """
+        self._before_call()
+
+        if self.payload_format == "suite":
+            # Encoded once, so retries resend the same bytes
+            body = gzip.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"),
+                                 compresslevel=PAYLOAD_COMPRESSION_LEVEL)
+            request_body = {"data": body, "headers": {"Content-Encoding": "gzip"}}
+        else:
+            request_body = {"json": payload}
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(self.url, timeout=timeout, **request_body)
+            except requests.ConnectionError:
+                if attempt >= self.max_retries:
+                    self._record_failure()
+                    raise
+            except requests.RequestException:
+                # Read timeouts are not retried since the code may simply be slow
+                self._record_failure()
+                raise
+            else:
+                if response.status_code < 500:
+                    self._record_success()
+                    return response
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    self._record_failure()
+                    return response
+
+            time.sleep(self._backoff_delay(attempt))
+            attempt += 1
+
+    def run(self, payload, timeout):
+        """Runs a payload on the remote executor and returns its output text."""
+        # Parse the response
+        return self._call(payload, timeout).get("output", "")
+
+    @property
+    def accepts_stdin(self):
+        """Runners that understand suite payloads also feed each run its "stdin" text."""
+        return self.payload_format == "suite"
+
+    @property
+    def supports_suites(self):
+        """Returns True if whole suites can be sent with run_suite."""
+        return self.payload_format == "suite"
+
+    def run_suite(self, payload, inputs, timeout):
+        """Runs the payload's program once per input in a single request.
+
+        Returns an (output_text, error_message) pair per input, where error_message is set
+        when that run could not finish.
+        """
+        outputs = self._call({**payload, "inputs": list(inputs)}, timeout).get("outputs")
+        if not isinstance(outputs, list) or len(outputs) != len(inputs):
+            raise ExecutionBackendError("Code execution service returned an unexpected number of outputs")
+        return [(output.get("output") or "", output.get("error")) for output in outputs]
+
+    def _call(self, payload, timeout):
+        """Posts a payload and returns the decoded JSON body of a 200 response."""
+        try:
+            response = self.post(payload, timeout)
+        except requests.Timeout as e:
+            raise ExecutionTimeoutError(f"Request failed: {str(e)}") from e
+        except requests.RequestException as e:
+            raise ExecutionBackendError(f"Request failed: {str(e)}") from e
+
+        if response.status_code != 200:
+            raise ExecutorResponseError(f"Code execution service error: {response.text}",
+                                        response.status_code)
+        try:
+            body = response.json()
+        except ValueError as e:
+            raise MalformedResponseError(f"Code execution service returned invalid JSON: {str(e)}") from e
+        if not isinstance(body, dict):
+            raise MalformedResponseError("Code execution service returned invalid JSON")
+        return body
+
+    def is_open(self):
+        """Returns True if the circuit is open and calls are currently being skipped."""
+        with self._lock:
+            return self._opened_at is not None and not self._cooled_down()
+
+    def _before_call(self):
+        """Fails fast while the circuit is open, allowing one trial call once it has cooled down."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self._cooled_down() and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            retry_in = max(1, round(self.reset_timeout - (time.monotonic() - self._opened_at)))
+            raise ExecutorUnavailableError(
+                f"Code execution service is unavailable, please try again in {retry_in} seconds"
+            )
+
+    def _cooled_down(self):
+        return time.monotonic() - self._opened_at >= self.reset_timeout
+
+    def _backoff_delay(self, attempt):
+        """Returns a full-jitter exponential backoff delay for the given retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def _record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._consecutive_failures >= self.failure_threshold:
+                # A failed trial call restarts the cool down
+                self._opened_at = time.monotonic()
+
+def sandbox_env(home_dir):
+    """Returns the stripped environment that submissions run with."""
+    return {"PATH": os.environ.get("PATH", ""), "HOME": home_dir, "LANG": "C.UTF-8"}
+
+class LocalExecutor:
+    """Runs submissions in sandboxed subprocesses on this machine.
+
+    Each run switches to the unprivileged sandbox_uid and sandbox_gid in a network
+    namespace of its own, so it can neither read the web server's files and environment
+    nor open connections. It gets a fresh temporary directory, a stripped environment, its
+    own process group and rlimits on CPU time, memory, file size and process count, and is
+    killed at the wall-clock timeout. The web server needs CAP_SETUID, CAP_SETGID,
+    CAP_CHOWN and CAP_SYS_ADMIN to start runs, as root has. JavaScript and Go are only
+    available when node and go are installed. When given a PythonWorkerPool, Python runs
+    are forked from its warm interpreters instead, and when given a CompiledProgramCache,
+    Go programs can be built once with run_compiled.
+    A payload's optional "stdin" text is fed to the program's standard input.
+    """
+
+    # Harnesses may read their test inputs from the payload's "stdin" field
+    accepts_stdin = True
+
+    def __init__(self, sandbox_uid, sandbox_gid, memory_mb=256, max_file_mb=16, go_cache_dir=None,
+                 python_pool=None, binary_cache=None, max_processes=DEFAULT_MAX_PROCESSES):
+        if sandbox_uid is None or sandbox_gid is None or sandbox_uid <= 0 or sandbox_gid <= 0:
+            raise ExecutionBackendError("Local code execution needs an unprivileged sandbox user "
+                                        "and group other than root")
+        self.sandbox_uid = sandbox_uid
+        self.sandbox_gid = sandbox_gid
+        self.memory_mb = memory_mb
+        self.max_file_mb = max_file_mb
+        self.max_processes = max_processes
+        # Written by the sandbox user's Go builds, so it is that user's
+        self.go_cache_dir = go_cache_dir or default_state_directory(f"devready-go-cache-{sandbox_uid}")
+        self.python_pool = python_pool
+        self.binary_cache = binary_cache
+
+    def run(self, payload, timeout):
+        """Runs a payload in a subprocess and returns its output text."""
+        if resource is None:
+            raise ExecutionBackendError("Local code execution is not supported on this platform")
+
+        language = payload["language"]
+        cpu_seconds = payload.get("timeout", timeout)
+        stdin_text = payload.get("stdin")
+
+        if language == "python" and self.python_pool is not None:
+            returncode, stdout, stderr, timed_out = self.python_pool.run(
+                payload["code"], cpu_seconds, timeout, self.memory_mb, self.max_file_mb, stdin_text,
+                self.max_processes, uid=self.sandbox_uid, gid=self.sandbox_gid)
+            if timed_out:
+                raise ExecutionTimeoutError(f"Time limit exceeded after {timeout} seconds")
+            return self._output(returncode, stdout, stderr, cpu_seconds)
+
+        with tempfile.TemporaryDirectory(prefix="devready-") as work_dir:
+            try:
+                command, env = self._command(language, payload["code"], work_dir)
+            except CompilationError as e:
+                # Build errors are the program's output, as go run reports them
+                return str(e)
+            returncode, stdout, stderr = self._run_process(command, env, work_dir, language,
+                                                           cpu_seconds, timeout, stdin_text)
+
+        return self._output(returncode, stdout, stderr, cpu_seconds)
+
+    def run_compiled(self, payload, inputs, timeout):
+        """Compiles a Go payload once, then runs the binary with each input on its stdin.
+
+        Returns an (output_text, error_message) pair per input. Raises CompilationError
+        with the compiler output if the code does not build.
+        """
+        if resource is None:
+            raise ExecutionBackendError("Local code execution is not supported on this platform")
+        if payload["language"] != "go" or not shutil.which("go"):
+            raise ExecutionBackendError(f"Language '{payload['language']}' cannot be compiled locally")
+        if self.binary_cache is None:
+            raise ExecutionBackendError("No compiled program cache is configured")
+
+        cpu_seconds = payload.get("timeout", timeout)
+        binary = self.binary_cache.get_or_build(payload["code"], self._build_go)
+
+        outputs = []
+        for stdin_text in inputs:
+            with tempfile.TemporaryDirectory(prefix="devready-") as work_dir:
+                env = sandbox_env(work_dir)
+                env["GOMEMLIMIT"] = f"{self.memory_mb}MiB"
+                try:
+                    # The sandbox user cannot reach into the private binary directory
+                    program = self._link_binary(binary, work_dir)
+                    returncode, stdout, stderr = self._run_process(
+                        [program], env, work_dir, "go", cpu_seconds, timeout, stdin_text)
+                    outputs.append((self._output(returncode, stdout, stderr, cpu_seconds), None))
+                except ExecutionBackendError as e:
+                    # One test hitting a limit does not stop the others from running
+                    outputs.append((None, str(e)))
+        return outputs
+
+    def _build_go(self, source, binary_path):
+        """Compiles Go source into binary_path, raising CompilationError if it does not build."""
+        with tempfile.TemporaryDirectory(prefix="devready-build-") as work_dir:
+            # Copied rather than moved, so the cached binary belongs to this user and the
+            # sandbox user cannot change it for later runs
+            shutil.copyfile(self._compile_go(source, work_dir), binary_path)
+            os.chmod(binary_path, 0o755)
+
+    def _compile_go(self, source, work_dir):
+        """Compiles Go source into a binary in work_dir and returns its path.
+
+        The build has GO_BUILD_TIMEOUT seconds of its own, so building the standard library
+        into a cold cache does not eat into the program's time limit. Raises
+        CompilationError with the compiler output if the code does not build.
+        """
+        with open(os.path.join(work_dir, "main.go"), "w", encoding="utf-8") as source_file:
+            source_file.write(source)
+        env = sandbox_env(work_dir)
+        env.update({
+            "GOCACHE": self._go_cache(),
+            "GOPATH": os.path.join(work_dir, "gopath"),
+            "CGO_ENABLED": "0"
+        })
+        returncode, stdout, stderr = self._run_process(
+            ["go", "build", "-o", "main", "main.go"], env, work_dir, "go",
+            GO_BUILD_TIMEOUT, GO_BUILD_TIMEOUT)
+        self._check_confined(returncode, stderr)
+        if returncode != 0:
+            raise CompilationError(stdout + stderr)
+        return os.path.join(work_dir, "main")
+
+    @staticmethod
+    def _link_binary(binary, work_dir):
+        """Makes a cached binary runnable from work_dir, returning its path there."""
+        program = os.path.join(work_dir, "main")
+        try:
+            os.link(binary, program)
+        except OSError:
+            # The binary directory is on another filesystem
+            shutil.copy2(binary, program)
+        return program
+
+    def _go_cache(self):
+        """Returns the Go build cache directory, owned by the sandbox user and nobody else."""
+        return ensure_private_directory(self.go_cache_dir, self.sandbox_uid, self.sandbox_gid)
+
+    def _run_process(self, command, env, work_dir, language, cpu_seconds, timeout, stdin_text=None):
+        """Runs a command in the sandbox, returning (returncode, stdout, stderr)."""
+        try:
+            process = subprocess.Popen(
+                self._limited_command(command, language, cpu_seconds),
+                cwd=work_dir,
+                env=env,
+                stdin=subprocess.DEVNULL if stdin_text is None else subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                start_new_session=True
+            )
+        except OSError as e:
+            raise ExecutionBackendError(f"Could not start {language} process: {str(e)}") from e
+
+        try:
+            stdout, stderr = process.communicate(stdin_text, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            # Kill the whole process group so children of the submission die too
+            os.killpg(process.pid, signal.SIGKILL)
+            process.communicate()
+            raise ExecutionTimeoutError(f"Time limit exceeded after {timeout} seconds") from e
+        return process.returncode, stdout, stderr
+
+    @staticmethod
+    def _check_confined(returncode, stderr):
+        """Raises ExecutionBackendError if a process exited because it could not be confined."""
+        if returncode == SANDBOX_FAILED_STATUS and stderr.startswith(SANDBOX_FAILED_PREFIX):
+            raise ExecutionBackendError(stderr.strip())
+
+    @classmethod
+    def _output(cls, returncode, stdout, stderr, cpu_seconds):
+        """Turns a finished process into output text, like the remote runner reports it."""
+        cls._check_confined(returncode, stderr)
+        if returncode == -signal.SIGXCPU:
+            raise ExecutionTimeoutError(f"Time limit exceeded after {cpu_seconds} seconds of CPU time")
+        if returncode < 0:
+            signal_name = signal.Signals(-returncode).name
+            raise ExecutionBackendError(f"Process was killed by {signal_name}")
+        if returncode != 0:
+            return stdout + stderr
+        return stdout
+
+    def _command(self, language, code, work_dir):
+        """Writes the code into work_dir and returns the command and environment to run it.
+
+        Go is built first, raising CompilationError if it does not build.
+        """
+        env = sandbox_env(work_dir)
+
+        if language == "python":
+            source, command = "main.py", [sys.executable, "-I", "main.py"]
+        elif language == "javascript" and shutil.which("node"):
+            source = "main.js"
+            command = ["node", f"--max-old-space-size={self.memory_mb}", "main.js"]
+        elif language == "go" and shutil.which("go"):
+            env["GOMEMLIMIT"] = f"{self.memory_mb}MiB"
+            return [self._compile_go(code, work_dir)], env
+        else:
+            raise ExecutionBackendError(f"Language '{language}' is not available for local execution")
+
+        with open(os.path.join(work_dir, source), "w", encoding="utf-8") as source_file:
+            source_file.write(code)
+        return command, env
+
+    def _limited_command(self, command, language, cpu_seconds):
+        """Wraps a command in sandbox_exec, which sets the rlimits, switches to the sandbox
+        user in its own network namespace and then execs it."""
+        # The V8 and Go runtimes reserve large address spaces up front, so they are
+        # bounded through their own heap limits instead
+        memory_bytes = self.memory_mb * 1024 * 1024 if language == "python" else 0
+        limits = [int(cpu_seconds), self.max_file_mb * 1024 * 1024, memory_bytes, self.max_processes,
+                  self.sandbox_uid, self.sandbox_gid]
+        return [sys.executable, "-I", "-S", SANDBOX_EXEC_PATH, *map(str, limits), "--", *command]
+
+class PythonForkServer:
+    """One warm python_fork_server process and the pipes used to talk to it."""
+
+    def __init__(self):
+        self.tasks_run = 0
+        self.home_dir = tempfile.mkdtemp(prefix="devready-worker-")
+        self.process = subprocess.Popen(
+            [sys.executable, "-I", FORK_SERVER_PATH],
+            cwd=self.home_dir,
+            env=sandbox_env(self.home_dir),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            start_new_session=True
+        )
+
+    def request(self, request, timeout):
+        """Sends one request and waits up to timeout seconds for the server's reply."""
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        line = self.process.stdout.readline() if ready else ""
+        if not line:
+            raise ExecutionBackendError("Python worker stopped responding")
+        self.tasks_run += 1
+        return json.loads(line)
+
+    def close(self):
+        """Stops the server process and removes its home directory."""
+        try:
+            self.process.kill()
+            self.process.wait()
+        except OSError:
+            pass
+        shutil.rmtree(self.home_dir, ignore_errors=True)
+
+class PythonWorkerPool:
+    """Pool of fork servers that already have the Python harness imports loaded.
+
+    Each run checks out an idle server, which forks a child for the submission, so
+    runs skip interpreter startup. A server is replaced after max_tasks runs or as
+    soon as it misbehaves, and at most size Python runs happen at once.
+    """
+
+    def __init__(self, size=2, max_tasks=100):
+        self.max_tasks = max_tasks
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(PythonForkServer())
+        atexit.register(self.close)
+
+    def run(self, code, cpu_seconds, timeout, memory_mb, max_file_mb, stdin_text=None,
+            max_processes=DEFAULT_MAX_PROCESSES, uid=None, gid=None):
+        """Runs code in a forked child as uid and gid, returning (returncode, stdout, stderr,
+        timed_out). The child refuses to run the code without them."""
+        server = self._idle.get()
+        try:
+            response = server.request({
+                "code": code,
+                "stdin": stdin_text,
+                "cpu_seconds": cpu_seconds,
+                "timeout": timeout,
+                "memory_mb": memory_mb,
+                "max_file_mb": max_file_mb,
+                "max_processes": max_processes,
+                "uid": uid,
+                "gid": gid
+            }, timeout=timeout + 5)
+        except (OSError, ValueError, ExecutionBackendError) as e:
+            server.close()
+            server = PythonForkServer()
+            raise ExecutionBackendError(f"Python worker failed: {str(e)}") from e
+        finally:
+            if server.tasks_run >= self.max_tasks:
+                server.close()
+                server = PythonForkServer()
+            self._idle.put(server)
+
+        if "error" in response:
+            raise ExecutionBackendError(f"Python worker failed: {response['error']}")
+        return response["returncode"], response["stdout"], response["stderr"], response["timed_out"]
+
+    def close(self):
+        """Stops every idle server in the pool."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+class CompiledProgramCache:
+    """Directory of compiled binaries keyed by a hash of their source.
+
+    Builds go to a temporary path and are renamed into place, so every worker on the
+    machine can share the directory. The binaries are executed later, so the directory
+    must be private to this user. Within a process, concurrent requests for the same
+    source wait for one build. The least recently used binaries beyond max_entries are
+    deleted after each build.
+    """
+
+    def __init__(self, directory, max_entries=200):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._build_locks = {}
+        self._lock = threading.Lock()
+        ensure_private_directory(directory)
+
+    def get_or_build(self, source, build):
+        """Returns the path of the binary for source, calling build(source, path) on a miss."""
+        key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        path = os.path.join(self.directory, key)
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        try:
+            with build_lock:
+                if os.path.exists(path):
+                    try:
+                        os.utime(path)
+                    except OSError:
+                        pass
+                    return path
+
+                temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try:
+                    build(source, temp_path)
+                    os.replace(temp_path, path)
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+        finally:
+            with self._lock:
+                self._build_locks.pop(key, None)
+
+        self.prune()
+        return path
+
+    def prune(self):
+        """Deletes the least recently used binaries beyond max_entries."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                continue
+            try:
+                entries.append((os.stat(os.path.join(self.directory, name)).st_mtime, name))
+            except OSError:
+                continue
+        entries.sort(reverse=True)
+        for _, name in entries[self.max_entries:]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
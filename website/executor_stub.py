@@ -0,0 +1,90 @@
+"""Local stand-in for the remote code runner that understands suite payloads.
+
+It serves POST /run with the remote runner's request format, accepting gzip-compressed
+bodies, and runs code with a LocalExecutor. A body with "inputs" runs the program once
+per input on its stdin and answers {"outputs": [{"output", "error"}, ...]}; any other
+body is run once and answered {"output"}. Point CODE_EXECUTOR_URL at it and set
+CODE_EXECUTOR_PAYLOAD_FORMAT to "suite" to try the suite format without the real runner.
+Runs switch to the given unprivileged user and group, so start it as root:
+
+    python -m website.executor_stub --sandbox-uid UID --sandbox-gid GID [--port 8081]
+"""
+import argparse
+import gzip
+import json
+import shutil
+from flask import Flask, jsonify, request
+from website.directories import default_state_directory
+from website.executor import CompilationError, CompiledProgramCache, ExecutionBackendError, LocalExecutor
+
+# Wall-clock seconds allowed per run when the payload does not say
+DEFAULT_TIMEOUT = 10
+
+def read_payload():
+    """Returns the request's JSON body, decompressing it first if it is gzipped."""
+    body = request.get_data()
+    if request.headers.get("Content-Encoding", "").lower() == "gzip":
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+def run_inputs(executor, payload, inputs, timeout):
+    """Runs the payload's program once per input, returning an output entry per input."""
+    if payload["language"] == "go" and executor.binary_cache is not None and shutil.which("go"):
+        # Build the program once rather than once per input
+        try:
+            pairs = executor.run_compiled(payload, inputs, timeout)
+        except CompilationError as e:
+            # Compile errors are the program's output for every input, as with go run
+            return [{"output": str(e), "error": None} for _ in inputs]
+        return [{"output": output, "error": error} for output, error in pairs]
+
+    outputs = []
+    for stdin_text in inputs:
+        try:
+            outputs.append({"output": executor.run({**payload, "stdin": stdin_text}, timeout),
+                            "error": None})
+        except ExecutionBackendError as e:
+            # One input hitting a limit does not stop the others from running
+            outputs.append({"output": None, "error": str(e)})
+    return outputs
+
+def create_stub_app(executor):
+    """Creates the stub runner, running code with the given LocalExecutor."""
+    app = Flask(__name__)
+
+    @app.route("/run", methods=["POST"])
+    def run():
+        try:
+            payload = read_payload()
+        except (OSError, ValueError) as e:
+            return jsonify({"error": f"Invalid request body: {str(e)}"}), 400
+        if not isinstance(payload, dict) or "language" not in payload or "code" not in payload:
+            return jsonify({"error": "language and code are required"}), 400
+
+        timeout = payload.get("timeout", DEFAULT_TIMEOUT)
+        inputs = payload.pop("inputs", None)
+        try:
+            if inputs is not None:
+                return jsonify({"outputs": run_inputs(executor, payload, inputs, timeout)})
+            return jsonify({"output": executor.run(payload, timeout)})
+        except ExecutionBackendError as e:
+            return jsonify({"error": str(e)}), 500
+
+    return app
+
+def main():
+    """Serves the stub runner until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8081, help="port to listen on")
+    parser.add_argument("--sandbox-uid", type=int, required=True,
+                        help="unprivileged user that runs switch to")
+    parser.add_argument("--sandbox-gid", type=int, required=True,
+                        help="unprivileged group that runs switch to")
+    args = parser.parse_args()
+    executor = LocalExecutor(args.sandbox_uid, args.sandbox_gid, binary_cache=CompiledProgramCache(
+        default_state_directory("devready-stub-go-binaries")))
+    create_stub_app(executor).run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
 """Necessary extensions for the website."""
+from flask_caching import Cache
+from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
+cache = Cache()
+migrate = Migrate()
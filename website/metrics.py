@@ -0,0 +1,173 @@
+"""Counters and latency histograms for the code execution pipeline.
+
+Each process records into its own MetricsRegistry and periodically writes a snapshot
+to a file named after its pid in a directory shared by every gunicorn worker. Rendering
+merges the snapshots, so whichever worker serves /metrics reports the totals of all of
+them in the Prometheus text format. Snapshots of workers that have exited are kept, so
+counters never go backwards when a worker is replaced.
+"""
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+from website.directories import ensure_private_directory
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+PHASE_SECONDS = "devready_execution_phase_seconds"
+ERRORS_TOTAL = "devready_execution_errors_total"
+
+# The type and help text of every metric the pipeline records
+METRICS = {
+    PHASE_SECONDS: ("histogram", "Seconds spent in each phase of running code against tests."),
+    ERRORS_TOTAL: ("counter", "Code execution failures by type.")
+}
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_number(value):
+    return repr(value) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    """Counters and histograms recorded by one process.
+
+    With a directory, a snapshot is written there at most every flush_interval seconds
+    while metrics are recorded, and render() includes every process's latest snapshot.
+    The directory must be private to this user, so nobody else can add snapshots.
+    """
+
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        if directory:
+            ensure_private_directory(directory)
+
+    def increment(self, name, labels, amount=1):
+        """Adds amount to a counter."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        self._maybe_flush()
+
+    def observe(self, name, labels, value):
+        """Records one value in a histogram."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"buckets": [0] * len(LATENCY_BUCKETS),
+                                                     "sum": 0.0, "count": 0}
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    histogram["buckets"][index] += 1
+                    break
+            histogram["sum"] += value
+            histogram["count"] += 1
+        self._maybe_flush()
+
+    @contextlib.contextmanager
+    def timer(self, name, labels):
+        """Observes the seconds spent inside the block, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, labels, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Returns this process's metrics as JSON-serializable data."""
+        with self._lock:
+            return {
+                "counters": [[name, list(map(list, labels)), value]
+                             for (name, labels), value in self._counters.items()],
+                "histograms": [[name, list(map(list, labels)), dict(histogram, buckets=list(histogram["buckets"]))]
+                               for (name, labels), histogram in self._histograms.items()]
+            }
+
+    def flush(self):
+        """Writes this process's snapshot to the shared directory."""
+        if not self.directory:
+            return
+        self._last_flush = time.monotonic()
+        data = json.dumps(self.snapshot()).encode("utf-8")
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as snapshot_file:
+                snapshot_file.write(data)
+            # Readers only ever see a whole snapshot
+            os.replace(temp_path, os.path.join(self.directory, f"{os.getpid()}.json"))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def collect(self):
+        """Returns the snapshots of every process sharing the directory, this one up to date."""
+        if not self.directory:
+            return [self.snapshot()]
+        self.flush()
+        snapshots = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as snapshot_file:
+                    snapshots.append(json.load(snapshot_file))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self):
+        """Returns the merged metrics of every process in the Prometheus text format."""
+        counters = {}
+        histograms = {}
+        for snapshot in self.collect():
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, histogram in snapshot["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.setdefault(key, {"buckets": [0] * len(LATENCY_BUCKETS),
+                                                     "sum": 0.0, "count": 0})
+                merged["buckets"] = [a + b for a, b in zip(merged["buckets"], histogram["buckets"])]
+                merged["sum"] += histogram["sum"]
+                merged["count"] += histogram["count"]
+
+        lines = []
+        for name, (metric_type, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+            for (metric, labels), histogram in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, histogram["buckets"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', _format_number(bound))])} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {histogram['count']}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(histogram['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def _maybe_flush(self):
+        if self.directory and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
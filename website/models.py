@@ -1,4 +1,5 @@
 """Database models for DevReady."""
+import json
 from datetime import datetime
 from flask_login import UserMixin
 from website.extensions import db
@@ -78,13 +79,78 @@ class Submission(db.Model):
     questionID = db.Column(db.Integer, db.ForeignKey('question.questionID'), nullable=False)
     code = db.Column(db.Text, nullable=False)  # Added code field
     result = db.Column(db.String(50), nullable=False)
-    runtime = db.Column(db.Integer, nullable=True)
+    runtime = db.Column(db.Float, nullable=True)  # Total milliseconds across tests
     language = db.Column(db.String(50), nullable=False)
     time = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     user = db.relationship('User', back_populates='submissions')
     question = db.relationship('Question', back_populates='submissions')
 
+class SubmissionJob(db.Model):
+    """Tracks a submission whose tests are run in the background."""
+    jobID = db.Column(db.String(32), primary_key=True)
+    userID = db.Column(db.Integer, db.ForeignKey('user.userID'), nullable=False)
+    questionID = db.Column(db.Integer, db.ForeignKey('question.questionID'), nullable=False)
+    code = db.Column(db.Text, nullable=False)
+    language = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed or failed
+    completedTests = db.Column(db.Integer, nullable=False, default=0)
+    totalTests = db.Column(db.Integer, nullable=False, default=0)
+    passed = db.Column(db.Boolean, nullable=True)
+    runtime = db.Column(db.Float, nullable=True)  # Total milliseconds across tests
+    fasterThan = db.Column(db.Float, nullable=True)  # Percent of passing submissions that were slower
+    memory = db.Column(db.Integer, nullable=True)  # Peak kilobytes of any test
+    results = db.Column(db.Text, nullable=True)  # JSON list of test results
+    error = db.Column(db.Text, nullable=True)
+    submissionID = db.Column(db.Integer, db.ForeignKey('submission.submissionID'), nullable=True)
+    createdAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updatedAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert job to the dictionary returned by the job status endpoint."""
+        return {
+            'jobID': self.jobID,
+            'questionID': self.questionID,
+            'language': self.language,
+            'status': self.status,
+            'completed': self.completedTests,
+            'total': self.totalTests,
+            'passed': self.passed,
+            'runtime': self.runtime,
+            'memory': self.memory,
+            'fasterThan': self.fasterThan,
+            'results': json.loads(self.results) if self.results else [],
+            'error': self.error,
+            'submissionID': self.submissionID
+        }
+
+class RuntimeBucket(db.Model):
+    """Counts passing submissions of a question and language whose runtime fell in one histogram bucket."""
+    __tablename__ = 'runtime_bucket'
+    questionID = db.Column(db.Integer, db.ForeignKey('question.questionID'), primary_key=True)
+    language = db.Column(db.String(50), primary_key=True)
+    bucket = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class UserQuestionProgress(db.Model):
+    """Summarizes a user's submissions to one question, so progress checks read a single row."""
+    __tablename__ = 'user_question_progress'
+    userID = db.Column(db.Integer, db.ForeignKey('user.userID'), primary_key=True)
+    questionID = db.Column(db.Integer, db.ForeignKey('question.questionID'), primary_key=True)
+    passed = db.Column(db.Boolean, nullable=False, default=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    firstPassedAt = db.Column(db.DateTime, nullable=True)
+    bestRuntime = db.Column(db.Float, nullable=True)  # Fastest passing runtime in milliseconds
+    bestRuntimeLanguage = db.Column(db.String(50), nullable=True)  # Language of the fastest passing runtime
+    lastPassedSubmissionID = db.Column(db.Integer, db.ForeignKey(
+        'submission.submissionID', name='fk_user_question_progress_last_passed'), nullable=True)
+
+class CatalogVersion(db.Model):
+    """Single row counting changes to the question catalog, so cached copies can tell they are stale."""
+    __tablename__ = 'catalog_version'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
 class TestCase(db.Model):
     """Represents a test case for a coding question."""
     testCaseID = db.Column(db.Integer, primary_key=True)
@@ -94,6 +160,22 @@ class TestCase(db.Model):
     isSample = db.Column(db.Boolean, default=False)
 
     question = db.relationship('Question', backref='testCases')
+    expectation = db.relationship('ExpectedOutput', uselist=False, lazy='joined',
+                                  cascade='all, delete-orphan')
+
+class ExpectedOutput(db.Model):
+    """Canonical form of a test case's expected output, computed when the test case is saved."""
+    __tablename__ = 'expected_output'
+    testCaseID = db.Column(db.Integer, db.ForeignKey('test_case.testCaseID'), primary_key=True)
+    comparator = db.Column(db.String(30), nullable=False)  # Comparator the canonical form is for
+    canonical = db.Column(db.Text, nullable=False)  # Canonical JSON of the expected output
+
+class QuestionComparator(db.Model):
+    """Names how a question's outputs are compared with their expected outputs."""
+    __tablename__ = 'question_comparator'
+    questionID = db.Column(db.Integer, db.ForeignKey('question.questionID'), primary_key=True)
+    comparator = db.Column(db.String(30), nullable=False)  # exact, unordered, nested_unordered, float_tolerance or linked_list
+    tolerance = db.Column(db.Float, nullable=True)  # Allowed difference for float_tolerance
 
 class MasteryScore(db.Model):
     """Tracks a user's proficiency in different coding concepts."""
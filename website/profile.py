@@ -1,13 +1,13 @@
 """Methods for profile info"""
 from flask import Blueprint
 from website.models import User, Submission, Question
+from website.progress import solved_count
 
 profile_blueprint = Blueprint("profile", __name__)
 
 def get_solved_count(user_id):
     """Returns user's count of unique problems solved"""
-    solved = Submission.query.filter_by(userID=user_id, result="Passed").all()
-    return len({x.questionID for x in solved})
+    return solved_count(user_id)
 
 def get_user_submissions(user_id):
     """Get user submissions."""
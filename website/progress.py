@@ -0,0 +1,117 @@
+"""Per-user question progress kept alongside submissions.
+
+Every submission upserts one UserQuestionProgress row for its user and question, so
+whether a user has passed a question, which questions they have solved, their fastest
+passing runtime and their latest passing submission are read through the primary key
+instead of by scanning their submissions. Databases that already held submissions are
+filled in by a migration, and `flask backfill-question-progress` rebuilds every row.
+"""
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import case, func, update
+from sqlalchemy.exc import IntegrityError
+from website.extensions import db
+from website.models import Submission, UserQuestionProgress
+
+def record_progress(submission):
+    """Counts a flushed submission towards its user's progress on the question."""
+    passed = submission.result == "Passed"
+    runtime_ms = submission.runtime
+    key = {"userID": submission.userID, "questionID": submission.questionID}
+    # The assignments are kept in order: MySQL lets later ones see the values set by
+    # earlier ones, so the best runtime's language is compared before the runtime changes
+    changes = [(UserQuestionProgress.attempts, UserQuestionProgress.attempts + 1)]
+    if passed:
+        changes += [
+            (UserQuestionProgress.passed, True),
+            (UserQuestionProgress.firstPassedAt,
+             func.coalesce(UserQuestionProgress.firstPassedAt, submission.time)),
+            (UserQuestionProgress.lastPassedSubmissionID, case(
+                (UserQuestionProgress.lastPassedSubmissionID > submission.submissionID,
+                 UserQuestionProgress.lastPassedSubmissionID),
+                else_=submission.submissionID))
+        ]
+        if runtime_ms is not None:
+            faster = (UserQuestionProgress.bestRuntime.is_(None)
+                      | (UserQuestionProgress.bestRuntime > runtime_ms))
+            changes += [
+                (UserQuestionProgress.bestRuntimeLanguage, case(
+                    (faster, submission.language), else_=UserQuestionProgress.bestRuntimeLanguage)),
+                (UserQuestionProgress.bestRuntime, case(
+                    (faster, runtime_ms), else_=UserQuestionProgress.bestRuntime))
+            ]
+    # Update in the database so concurrent submits do not lose attempts
+    if _update_progress(key, changes):
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(UserQuestionProgress(
+                passed=passed, attempts=1, firstPassedAt=submission.time if passed else None,
+                bestRuntime=runtime_ms if passed else None,
+                bestRuntimeLanguage=submission.language if passed and runtime_ms is not None else None,
+                lastPassedSubmissionID=submission.submissionID if passed else None, **key))
+    except IntegrityError:
+        # Another submit created the row first
+        _update_progress(key, changes)
+
+def _update_progress(key, changes):
+    statement = update(UserQuestionProgress).filter_by(**key).ordered_values(*changes)
+    return db.session.execute(statement).rowcount
+
+def backfill_progress():
+    """Rebuilds every progress row from the saved submissions and returns how many there are."""
+    passed = Submission.result == "Passed"
+    rows = (
+        db.session.query(
+            Submission.userID,
+            Submission.questionID,
+            func.count(Submission.submissionID),
+            func.max(case((passed, 1), else_=0)),
+            func.min(case((passed, Submission.time))),
+            func.min(case((passed, Submission.runtime))),
+            func.max(case((passed, Submission.submissionID)))
+        )
+        .group_by(Submission.userID, Submission.questionID)
+        .all()
+    )
+    # Fastest last, so each user and question keeps the language of its best runtime
+    best_languages = {
+        (user_id, question_id): language
+        for user_id, question_id, language in db.session.query(
+            Submission.userID, Submission.questionID, Submission.language)
+        .filter(passed, Submission.runtime.isnot(None))
+        .order_by(Submission.runtime.desc(), Submission.submissionID.desc())
+    }
+    UserQuestionProgress.query.delete()
+    db.session.add_all([
+        UserQuestionProgress(userID=user_id, questionID=question_id, attempts=attempts,
+                             passed=bool(has_passed), firstPassedAt=first_passed_at,
+                             bestRuntime=best_runtime,
+                             bestRuntimeLanguage=best_languages.get((user_id, question_id)),
+                             lastPassedSubmissionID=last_passed_id)
+        for user_id, question_id, attempts, has_passed, first_passed_at, best_runtime, last_passed_id
+        in rows
+    ])
+    return len(rows)
+
+def has_passed(user_id, question_id):
+    """Returns True if the user has passed the question."""
+    progress = db.session.get(UserQuestionProgress, (user_id, question_id))
+    return progress is not None and progress.passed
+
+def passed_question_ids(user_id):
+    """Returns the IDs of every question the user has passed."""
+    return {question_id for (question_id,) in db.session.query(UserQuestionProgress.questionID)
+            .filter_by(userID=user_id, passed=True)}
+
+def solved_count(user_id):
+    """Returns the number of questions the user has passed."""
+    return UserQuestionProgress.query.filter_by(userID=user_id, passed=True).count()
+
+@click.command("backfill-question-progress")
+@with_appcontext
+def backfill_question_progress_command():
+    """Rebuilds per-user question progress from every saved submission."""
+    count = backfill_progress()
+    db.session.commit()
+    click.echo(f"Backfilled progress for {count} user questions")
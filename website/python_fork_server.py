@@ -0,0 +1,145 @@
+"""Fork server that runs Python submissions in children of a pre-warmed interpreter.
+
+The server imports everything the Python harness needs once, then reads one JSON
+request per line from stdin. For each request it forks a child that applies the
+limits of sandbox_exec, isolates itself from the network and switches to the
+request's unprivileged uid and gid, then runs the code with stdout and stderr
+written to files and exits.
+The server answers every request with one JSON line holding the child's exit
+status and output, so per-test overhead is a fork instead of interpreter startup.
+"""
+import importlib.util
+import json
+import os
+import select
+import signal
+import sys
+import tempfile
+import time
+import traceback
+# Modules imported by format_python's harness, loaded here so forked children start warm
+import ast  # pylint: disable=unused-import
+import bisect  # pylint: disable=unused-import
+import collections  # pylint: disable=unused-import
+import contextlib  # pylint: disable=unused-import
+import functools  # pylint: disable=unused-import
+import heapq  # pylint: disable=unused-import
+import io  # pylint: disable=unused-import
+import math  # pylint: disable=unused-import
+import typing  # pylint: disable=unused-import
+
+def load_sandbox_exec():
+    """Loads sandbox_exec from beside this file, which -I keeps off sys.path."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_exec.py")
+    spec = importlib.util.spec_from_file_location("sandbox_exec", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+sandbox_exec = load_sandbox_exec()
+
+def run_child(code, request, work_dir):
+    """Runs in the forked child: confines itself, executes the code and exits.
+
+    The code is never run if the child could not switch to the sandbox user.
+    """
+    status = 1
+    try:
+        os.setsid()
+        os.chdir(work_dir)
+
+        stdin = os.open("stdin" if request.get("stdin") is not None else os.devnull, os.O_RDONLY)
+        stdout = os.open("stdout", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        stderr = os.open("stderr", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.dup2(stdin, 0)
+        os.dup2(stdout, 1)
+        os.dup2(stderr, 2)
+        # The inherited sys.stdin may hold buffered protocol input, so read fd 0 afresh
+        sys.stdin = open(0, encoding="utf-8", closefd=False)  # pylint: disable=consider-using-with
+
+        try:
+            sandbox_exec.apply_limits(request["cpu_seconds"], request["max_file_mb"] * 1024 * 1024,
+                                      request["memory_mb"] * 1024 * 1024, request["max_processes"])
+            sandbox_exec.enter_sandbox(request["uid"], request["gid"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            sys.stderr.write(f"{sandbox_exec.SANDBOX_FAILED_PREFIX} {e}\n")
+            status = sandbox_exec.SANDBOX_FAILED_STATUS
+            return
+
+        sys.argv = ["main.py"]
+        exec(compile(code, "main.py", "exec"), {"__name__": "__main__"})  # pylint: disable=exec-used
+        status = 0
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else int(e.code is not None)
+    except BaseException as e:  # pylint: disable=broad-exception-caught
+        # Skip this module's frame so the traceback starts in the submission
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(status)
+
+def wait_for_exit(pid, timeout):
+    """Waits up to timeout seconds for the child to exit, without reaping it."""
+    if hasattr(os, "pidfd_open"):
+        pidfd = os.pidfd_open(pid)
+        try:
+            ready, _, _ = select.select([pidfd], [], [], timeout)
+        finally:
+            os.close(pidfd)
+        return bool(ready)
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None:
+            return True
+        time.sleep(0.002)
+    return False
+
+def read_output(path):
+    """Reads a captured output file, tolerating invalid UTF-8."""
+    with open(path, encoding="utf-8", errors="replace") as output_file:
+        return output_file.read()
+
+def run_request(request):
+    """Forks a child for one request and returns its exit status and captured output."""
+    with tempfile.TemporaryDirectory(prefix="devready-") as work_dir:
+        if request.get("stdin") is not None:
+            # The child reads its standard input from this file
+            with open(os.path.join(work_dir, "stdin"), "w", encoding="utf-8") as stdin_file:
+                stdin_file.write(request["stdin"])
+        pid = os.fork()
+        if pid == 0:
+            run_child(request["code"], request, work_dir)
+
+        timed_out = not wait_for_exit(pid, request["timeout"])
+        try:
+            # The unreaped child keeps its process group id reserved, so this only
+            # reaches the submission and anything it left running
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        status = os.waitpid(pid, 0)[1]
+
+        return {
+            "returncode": os.waitstatus_to_exitcode(status),
+            "stdout": read_output(os.path.join(work_dir, "stdout")),
+            "stderr": read_output(os.path.join(work_dir, "stderr")),
+            "timed_out": timed_out
+        }
+
+def main():
+    """Serves requests from stdin until it is closed."""
+    protocol_out = sys.stdout
+    for line in sys.stdin:
+        try:
+            response = run_request(json.loads(line))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            response = {"error": f"{type(e).__name__}: {str(e)}"}
+        protocol_out.write(json.dumps(response) + "\n")
+        protocol_out.flush()
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,162 @@
 """This module handles the endpoints and functions related to questions."""
-from flask import Blueprint, request, jsonify, render_template
+from flask import Blueprint, Response, current_app, request, jsonify, render_template, url_for
 from flask_login import login_required, current_user
-from .models import Question, QuestionTag, MasteryScore, Submission, Tag
+from sqlalchemy import func, select
+from sqlalchemy.orm import subqueryload
+from .models import Question, QuestionTag, MasteryScore, Submission, Tag, TestCase, UserQuestionProgress
 from .extensions import db
+from .catalog import (SHARED_CACHE_CONTROL, cached_catalog, catalog_etag, catalog_version,
+                      not_modified, with_validators)
+from .progress import has_passed, passed_question_ids
+from .runtime_ranking import runtime_percentile
 import random
 
 questions_blueprint = Blueprint("questions", __name__)
 
+# Columns a listing can be narrowed to with fields=, by the names they have in the response
+LISTING_COLUMNS = {
+    "questionID": Question.questionID,
+    "title": Question.title,
+    "description": Question.description,
+    "difficulty": Question.difficulty,
+    "createdDate": Question.createdDate,
+    "expected_method": Question.expected_method
+}
+
+# Fields loaded by a separate query over the page rather than selected as columns
+LISTING_RELATIONS = ("tags", "sample_test_cases")
+
+LISTING_FIELDS = tuple(LISTING_COLUMNS) + LISTING_RELATIONS
+
+# Shorter names clients may use in fields=
+FIELD_ALIASES = {"id": "questionID"}
+
+# Most questions returned by one page of a listing
+MAX_PAGE_SIZE = 500
+
+def parse_listing_args(args):
+    """Returns the after cursor, limit and fields of a listing request, or raises ValueError.
+
+    after and limit are None when not given, and fields lists every field by default.
+    """
+    try:
+        after = int(args["after"]) if args.get("after") else None
+        limit = int(args["limit"]) if args.get("limit") else None
+    except ValueError as e:
+        raise ValueError("after and limit must be integers") from e
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be at least 1")
+    if limit is not None:
+        limit = min(limit, MAX_PAGE_SIZE)
+
+    fields = LISTING_FIELDS
+    if args.get("fields"):
+        requested = [FIELD_ALIASES.get(name.strip(), name.strip())
+                     for name in args["fields"].split(",") if name.strip()]
+        unknown = [name for name in requested if name not in LISTING_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        # The cursor needs every question's ID, so it is always included
+        fields = tuple(name for name in LISTING_FIELDS if name in requested or name == "questionID")
+    return after, limit, fields
+
+def question_listing(filters, after, limit, fields):
+    """Returns one page of questions matching filters, ordered by ID, and the cursor of the next page.
+
+    Only the requested columns are selected, and tags and sample test cases are each loaded
+    by one query over the page's question IDs, so a page takes at most three queries however
+    many questions it holds. Without a limit every matching question is on the page, so
+    those queries select the IDs with the listing's own filters, as a subquery load does,
+    rather than binding one parameter per question. The cursor is None on the last page.
+    """
+    columns = [LISTING_COLUMNS[name] for name in fields if name in LISTING_COLUMNS]
+    if after is not None:
+        filters = [*filters, Question.questionID > after]
+    query = db.session.query(*columns).filter(*filters).order_by(Question.questionID)
+    if limit is not None:
+        # One extra row tells whether there is a next page
+        query = query.limit(limit + 1)
+    rows = query.all()
+    has_more = limit is not None and len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return [], None
+
+    questions = {}
+    for row in rows:
+        question = {name: getattr(row, name) for name in fields if name in LISTING_COLUMNS}
+        if question.get("createdDate"):
+            question["createdDate"] = question["createdDate"].isoformat()
+        if "expected_method" in question:
+            question["expected_method"] = question["expected_method"] or None
+        if "tags" in fields:
+            question["tags"] = []
+        if "sample_test_cases" in fields:
+            question["sample_test_cases"] = []
+        questions[row.questionID] = question
+
+    page_ids = list(questions) if limit is not None else select(Question.questionID).where(*filters)
+    if "tags" in fields:
+        tag_rows = (
+            db.session.query(QuestionTag.questionID, Tag.name)
+            .join(Tag, Tag.tagID == QuestionTag.tagID)
+            .filter(QuestionTag.questionID.in_(page_ids))
+            .order_by(QuestionTag.questionTagID)
+            .all()
+        )
+        for question_id, name in tag_rows:
+            questions[question_id]["tags"].append(name)
+    if "sample_test_cases" in fields:
+        sample_rows = (
+            db.session.query(TestCase.questionID, TestCase.inputData, TestCase.expectedOutput)
+            .filter(TestCase.isSample.is_(True), TestCase.questionID.in_(page_ids))
+            .order_by(TestCase.testCaseID)
+            .all()
+        )
+        for question_id, input_data, expected_output in sample_rows:
+            questions[question_id]["sample_test_cases"].append(
+                {"input": input_data, "expected_output": expected_output})
+
+    return list(questions.values()), (rows[-1].questionID if has_more else None)
+
+def listing_response(name, filters):
+    """Responds with the page of a question listing the request asks for.
+
+    The page is a JSON list, and a Link header with rel="next" points to the next page.
+    A request whose If-None-Match holds the page's ETag is answered 304 without building it.
+    """
+    try:
+        after, limit, fields = parse_listing_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    key = f"{name}:{after}:{limit}:{','.join(fields)}"
+    version = catalog_version()
+    etag = catalog_etag(version, key)
+    unchanged = not_modified(etag, SHARED_CACHE_CONTROL)
+    if unchanged is not None:
+        return unchanged
+
+    def build():
+        questions, next_after = question_listing(filters, after, limit, fields)
+        return current_app.json.dumps(questions), next_after
+
+    body, next_after = cached_catalog(key, build, version)
+    response = Response(body, mimetype=current_app.json.mimetype)
+    if next_after is not None:
+        args = {**request.args.to_dict(), "after": next_after}
+        response.headers["Link"] = f'<{url_for(request.endpoint, **args)}>; rel="next"'
+    return with_validators(response, etag, SHARED_CACHE_CONTROL)
+
 @questions_blueprint.route("/questions", methods=["GET"])
 @login_required
 def get_questions():
-    """Get all questions from the database, with sample test cases."""
+    """Get questions from the database, with sample test cases.
+
+    Supports keyset pagination with after and limit, and fields= to return only some fields.
+    """
     try:
-        questions = Question.query.all()
-        return jsonify([{
-            **question.to_dict(),
-            "tags": [tag.name for tag in question.tags],
-            "sample_test_cases": [
-                {"input": tc.inputData, "expected_output": tc.expectedOutput}
-                for tc in question.testCases
-                if tc.isSample
-            ]
-        } for question in questions])
+        return listing_response("questions", [])
     except Exception as e:
         return jsonify({"error": "Failed to fetch questions", "details": str(e)}), 500
 
@@ -36,37 +171,32 @@ def get_question_by_id(question_id):
         sample_tests = [test for test in question.testCases if test.isSample]
         acceptance_rate = get_acceptance_rate(question_id)
         has_passed = has_passed_question(current_user.userID, question.questionID)
+        runtime_rank = get_runtime_rank(current_user.userID, question.questionID)
 
         return render_template('question.html',
                              question=question,
                              sample_tests=sample_tests,
                              user=current_user,
                              acceptance_rate=acceptance_rate,
-                             has_passed = has_passed)
+                             has_passed = has_passed,
+                             runtime_rank=runtime_rank)
     except Exception as e:
         return jsonify({"error": "Failed to fetch question", "details": str(e)}), 500
 
 @questions_blueprint.route("/questions/tags", methods=["GET"])
 @login_required
 def get_questions_by_tag():
-    """Get questions, with sample test cases, by a specific tag."""
+    """Get questions, with sample test cases, by a specific tag.
+
+    Takes the same after, limit and fields parameters as /questions.
+    """
     try:
         tag = request.args.get("tag")
         if not tag:
             return jsonify({"error": "Tag parameter is required"}), 400
 
-        questions = Question.query.join(QuestionTag).filter(
-            QuestionTag.tag.has(name=tag)
-        ).all()
-        return jsonify([{
-            **question.to_dict(),
-            "tags": [tag.name for tag in question.tags],
-            "sample_test_cases": [
-                {"input": tc.inputData, "expected_output": tc.expectedOutput}
-                for tc in question.testCases
-                if tc.isSample
-            ]
-        } for question in questions])
+        return listing_response(f"questions-by-tag:{tag}",
+                                [Question.questionTags.any(QuestionTag.tag.has(name=tag))])
     except Exception as e:
         return jsonify({"error": "Failed to fetch questions by tag", "details": str(e)}), 500
 
@@ -78,13 +208,7 @@ def get_next_question(user_id):
     tag_completion_count = {tag_id: 0 for tag_id, _ in all_tags}
 
     # Step 2: Get all passed question IDs by the user
-    passed_ids_list = (
-        db.session.query(Submission.questionID)
-        .filter_by(userID=user_id, result="Passed")
-        .distinct()
-        .all()
-    )
-    passed_ids_list = [q[0] for q in passed_ids_list]
+    passed_ids_list = list(passed_question_ids(user_id))
     
     # Step 3: Get all tags associated with the passed questions
     passed_question_tags = (
@@ -125,15 +249,19 @@ def get_next_question(user_id):
     sample_tests = [test for test in question.testCases if test.isSample] if question else []
     return question, sample_tests
 
-def get_all_tags_with_questions():
-    """Fetch all tags with their associated questions."""
-    # Fetch all tags and their associated questions in one optimized query
+def get_all_tags_with_questions(version=None):
+    """Fetch all tags with their associated questions, as dictionaries that include their tag names."""
+    return cached_catalog("library", build_tags_with_questions, version)
+
+def build_tags_with_questions():
+    """Group every question under each of its tags, ordered by tag name and difficulty."""
     tag_questions = {}
 
     tags_with_questions = (
         db.session.query(Tag.name, Question)
         .join(QuestionTag, Tag.tagID == QuestionTag.tagID)
         .join(Question, Question.questionID == QuestionTag.questionID)
+        .options(subqueryload(Question.questionTags).joinedload(QuestionTag.tag))
         .order_by(Tag.name, Question.difficulty)
         .all()
     )
@@ -142,29 +270,37 @@ def get_all_tags_with_questions():
     for tag_name, question in tags_with_questions:
         if tag_name not in tag_questions:
             tag_questions[tag_name] = []
-        tag_questions[tag_name].append(question)
+        tag_questions[tag_name].append({**question.to_dict(),
+                                        "tags": [tag.name for tag in question.tags]})
 
     return tag_questions
 
 def get_all_completed_questions(user_id):
     '''Get all completed question IDs for a user'''
-    completed_question_ids = set(
-        db.session.query(Submission.questionID)
-        .filter(Submission.userID == user_id, Submission.result == "Passed")
-        .distinct()
-        .all()
+    return passed_question_ids(user_id)
+
+def get_latest_passed_submission_id(user_id):
+    """Get the ID of the user's most recent passing submission, or None, which changes when they complete a question."""
+    return (
+        db.session.query(func.max(UserQuestionProgress.lastPassedSubmissionID))
+        .filter(UserQuestionProgress.userID == user_id)
+        .scalar()
     )
-    completed_question_ids = {qid[0] for qid in completed_question_ids}
-    return completed_question_ids
 
 def has_passed_question(user_id, question_id):
     """Return True if the user has passed the given question."""
-    passed = (
-        db.session.query(Submission)
-        .filter_by(userID=user_id, questionID=question_id, result="Passed")
-        .first()
-    )
-    return passed is not None
+    return has_passed(user_id, question_id)
+
+def get_runtime_rank(user_id, question_id):
+    """Return the user's fastest passing runtime on a question and how it ranks, or None."""
+    progress = db.session.get(UserQuestionProgress, (user_id, question_id))
+    if progress is None or progress.bestRuntime is None:
+        return None
+    faster_than = runtime_percentile(question_id, progress.bestRuntimeLanguage, progress.bestRuntime)
+    if faster_than is None:
+        return None
+    return {"runtime": progress.bestRuntime, "language": progress.bestRuntimeLanguage,
+            "fasterThan": faster_than}
 
 def get_acceptance_rate(question_id):
     """Get the acceptance rate of a given question."""
@@ -0,0 +1,62 @@
+"""Per-question runtime distribution used to rank passing submissions.
+
+Each passing submission increments one bucket of a log-scale histogram kept per question
+and language, so recording a runtime is a single row update and ranking one reads at most
+a couple of hundred bucket rows through the primary key, however many submissions exist.
+"""
+import math
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from website.extensions import db
+from website.models import RuntimeBucket
+
+# Each bucket covers runtimes up to 10% longer than the one before, starting at a microsecond
+BUCKET_GROWTH = 1.1
+
+def runtime_bucket(runtime_ms):
+    """Returns the histogram bucket of a runtime in milliseconds."""
+    microseconds = runtime_ms * 1000
+    if microseconds < 1:
+        return 0
+    return int(math.log(microseconds) / math.log(BUCKET_GROWTH)) + 1
+
+def record_runtime(question_id, language, runtime_ms):
+    """Adds a passing submission's runtime to the question's distribution for its language."""
+    bucket = runtime_bucket(runtime_ms)
+    key = {"questionID": question_id, "language": language, "bucket": bucket}
+    # Increment in the database so concurrent submits do not lose counts
+    if RuntimeBucket.query.filter_by(**key).update({RuntimeBucket.count: RuntimeBucket.count + 1}):
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(RuntimeBucket(count=1, **key))
+    except IntegrityError:
+        # Another submit created the bucket first
+        RuntimeBucket.query.filter_by(**key).update({RuntimeBucket.count: RuntimeBucket.count + 1})
+
+def runtime_percentile(question_id, language, runtime_ms):
+    """Returns the percent of other passing submissions slower than runtime_ms, or None without any.
+
+    Runtimes in the same bucket count as half slower, and the distribution is expected to
+    already include the submission being ranked.
+    """
+    bucket = runtime_bucket(runtime_ms)
+    total, slower, same = db.session.query(
+        func.sum(RuntimeBucket.count),
+        func.sum(case((RuntimeBucket.bucket > bucket, RuntimeBucket.count), else_=0)),
+        func.sum(case((RuntimeBucket.bucket == bucket, RuntimeBucket.count), else_=0))
+    ).filter_by(questionID=question_id, language=language).one()
+
+    # Leave out the submission being ranked
+    others = (total or 0) - 1
+    if others <= 0:
+        return None
+    same = max((same or 0) - 1, 0)
+    return round(((slower or 0) + same / 2) / others * 100, 1)
+
+def record_and_rank(question_id, language, runtime_ms):
+    """Records a passing submission's runtime and returns its percentile among the question's submissions."""
+    if runtime_ms is None:
+        return None
+    record_runtime(question_id, language, runtime_ms)
+    return runtime_percentile(question_id, language, runtime_ms)
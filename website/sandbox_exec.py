@@ -0,0 +1,87 @@
+"""Exec wrapper that confines a submission process, then runs a command.
+
+LocalExecutor starts every submission process through this wrapper instead of using a
+preexec_fn. A preexec_fn runs Python in the forked child of a process full of threads,
+where it can deadlock on a lock another thread held at fork time:
+
+    python -I -S sandbox_exec.py CPU_SECONDS MAX_FILE_BYTES MEMORY_BYTES MAX_PROCESSES \
+        UID GID -- COMMAND...
+
+Before the exec, the wrapper sets the rlimits, moves into a network namespace of its own
+with no interfaces up, hands the working directory to UID and GID, and switches to them
+for good, so the command can read neither the web server's files nor its environment.
+The web server's user needs CAP_SETUID, CAP_SETGID, CAP_CHOWN and CAP_SYS_ADMIN for
+this, as root has. If any step fails the command is not run.
+
+MEMORY_BYTES of 0 leaves the address space unlimited. MAX_PROCESSES bounds the processes
+and threads of UID, so a fork bomb fails instead of exhausting the host.
+"""
+import ctypes
+import os
+import resource
+import sys
+
+# Flags of unshare(2) and prctl(2) from the Linux headers
+CLONE_NEWNET = 0x40000000
+PR_SET_NO_NEW_PRIVS = 38
+
+# Exit status when the sandbox could not be entered, reported as a backend failure
+SANDBOX_FAILED_STATUS = 126
+SANDBOX_FAILED_PREFIX = "Could not enter the sandbox:"
+
+def apply_limits(cpu_seconds, max_file_bytes, memory_bytes, max_processes):
+    """Sets the rlimits that every process started for a submission runs under."""
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (max_file_bytes, max_file_bytes))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_NPROC, (max_processes, max_processes))
+    if memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+
+def _libc_call(name, *args):
+    """Calls a libc function that returns -1 and sets errno on failure."""
+    libc = ctypes.CDLL(None, use_errno=True)
+    if getattr(libc, name)(*args) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"{name}: {os.strerror(errno)}")
+
+def enter_sandbox(uid, gid):
+    """Isolates this process from the network and switches it to uid and gid for good.
+
+    The current directory and the files in it are handed to uid, so the submission can
+    read its source and write its own files. Raises if any step fails, or if uid or gid
+    is root.
+    """
+    if uid <= 0 or gid <= 0:
+        raise PermissionError("the sandbox user and group must not be root")
+    _libc_call("unshare", CLONE_NEWNET)
+    os.chown(".", uid, gid)
+    for name in os.listdir("."):
+        os.lchown(name, uid, gid)
+    os.setgroups([])
+    os.setresgid(gid, gid, gid)
+    os.setresuid(uid, uid, uid)
+    # Setuid programs cannot give the submission its privileges back
+    _libc_call("prctl", PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0)
+    if os.getresuid() != (uid, uid, uid) or os.getresgid() != (gid, gid, gid):
+        raise PermissionError("the sandbox user could not be switched to")
+
+def main(argv):
+    """Applies the limits and user given in argv and replaces this process with the command."""
+    separator = argv.index("--")
+    *limits, uid, gid = (int(value) for value in argv[1:separator])
+    command = argv[separator + 1:]
+    try:
+        apply_limits(*limits)
+        enter_sandbox(uid, gid)
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"{SANDBOX_FAILED_PREFIX} {e}\n")
+        os._exit(SANDBOX_FAILED_STATUS)
+    try:
+        os.execvp(command[0], command)
+    except OSError as e:
+        sys.stderr.write(f"Could not start {command[0]}: {e}\n")
+        os._exit(127)
+
+if __name__ == "__main__":
+    main(sys.argv)
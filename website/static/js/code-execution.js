@@ -36,6 +36,12 @@ async function executeCode(endpoint, isSubmission = false) {
 
     // Try running code
     try {
+        // Runs stream each sample's result, while submissions are queued as background jobs
+        if (!isSubmission && window.ReadableStream && window.TextDecoder) {
+            await streamResults(endpoint, questionId, code, language);
+            return;
+        }
+
         const res = await fetch(`/${endpoint}/${questionId}`, {
             method: "POST",
             headers: { "Content-Type": "application/json" },
@@ -43,7 +49,18 @@ async function executeCode(endpoint, isSubmission = false) {
             body: JSON.stringify({ code, language }),
         });
         const result = await res.json();
-        isSubmission ? displaySubmissionResults(result.results) : displayRunResults(result.results);
+        // Busy runners answer 429 with a message saying when to try again
+        if (!res.ok) throw new Error(result.error);
+        if (isSubmission) {
+            // Submissions run in the background, so follow the job's progress until it finishes
+            const job = window.ReadableStream && window.TextDecoder
+                ? await streamSubmissionJob(result, testCaseStatus)
+                : await waitForSubmissionJob(result, testCaseStatus);
+            if (job.status === "failed") throw new Error(job.error);
+            displaySubmissionResults(job.results, job);
+        } else {
+            displayRunResults(result.results);
+        }
     } catch (error) {
         // Hide output and show fetch error
         outputContainer.style.display = "none";
@@ -52,27 +69,133 @@ async function executeCode(endpoint, isSubmission = false) {
     }
 }
 
+// Run code through the streaming endpoint, rendering each test result as soon as it finishes
+async function streamResults(endpoint, questionId, code, language) {
+    const res = await fetch(`/${endpoint}/${questionId}/stream`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        credentials: "include",
+        body: JSON.stringify({ code, language }),
+    });
+    if (!res.ok) {
+        const error = await res.json();
+        throw new Error(error.error);
+    }
+
+    const results = [];
+    await readEventStream(res, (event, data) => {
+        if (event === "test") {
+            results[data.index] = data;
+            displayRunResult(data, data.index);
+        } else if (event === "summary") {
+            displayRunResults(results);
+        } else if (event === "error") {
+            throw new Error(data.error);
+        }
+    });
+}
+
+// Read a Server-Sent Events response body, calling onEvent with each event's name and JSON data
+async function readEventStream(res, onEvent) {
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+            const message = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = "message";
+            let data = "";
+            message.split("\n").forEach(line => {
+                if (line.startsWith("event: ")) event = line.slice(7);
+                else if (line.startsWith("data: ")) data += line.slice(6);
+            });
+            if (data) onEvent(event, JSON.parse(data));
+        }
+    }
+}
+
+// Follow a queued submission job's event stream until it completes or fails, counting each test as it finishes
+async function streamSubmissionJob(job, testCaseStatus) {
+    if (!job.streamUrl) throw new Error(job.error || "Submission could not be queued");
+
+    const res = await fetch(job.streamUrl, { credentials: "include" });
+    if (!res.ok) {
+        const error = await res.json();
+        throw new Error(error.error);
+    }
+
+    const results = [];
+    let summary = null;
+    await readEventStream(res, (event, data) => {
+        if (event === "test") {
+            results[data.index] = data;
+            const progress = testCaseStatus.querySelector("span");
+            if (progress) {
+                progress.textContent = `Running Tests... (${results.filter(Boolean).length}/${data.total})`;
+            }
+        } else if (event === "summary") {
+            summary = data;
+        } else if (event === "error") {
+            throw new Error(data.error);
+        }
+    });
+    if (!summary) throw new Error("Lost the connection to the submission, please submit again");
+    return { ...summary, status: "completed", results };
+}
+
+// Poll a queued submission job until it completes or fails, showing its progress
+async function waitForSubmissionJob(job, testCaseStatus) {
+    if (!job.statusUrl) throw new Error(job.error || "Submission could not be queued");
+
+    while (true) {
+        const res = await fetch(job.statusUrl, { credentials: "include" });
+        const update = await res.json();
+        if (!res.ok) throw new Error(update.error);
+        if (update.status === "completed" || update.status === "failed") return update;
+
+        const progress = testCaseStatus.querySelector("span");
+        if (progress && update.total) {
+            progress.textContent = `Running Tests... (${update.completed}/${update.total})`;
+        }
+        await new Promise(resolve => setTimeout(resolve, 500));
+    }
+}
+
 // Update sample test case buttons based on run results
 function displayRunResults(results) {
     // Test case buttons
     const buttons = document.querySelectorAll("#test-case-buttons button");
 
     // Add results to buttons
-    results.forEach((test, i) => {
-        if (i < buttons.length) {
-            const btn = buttons[i];
-            btn.className = test.passed ? "btn-testcase-pass" : "btn-testcase-fail";
-            btn.onclick = () => showTestCase(test.stderr, test.input, test.stdout, test.output, test.expected, btn, false);
-        }
-    });
+    results.forEach((test, i) => displayRunResult(test, i));
 
     // Automatically show the first test case result
     showTestCase(results[0].stderr, results[0].input, results[0].stdout, results[0].output, results[0].expected, buttons[0], false);
 }
 
+// Update one sample test case button with its result
+function displayRunResult(test, i) {
+    const buttons = document.querySelectorAll("#test-case-buttons button");
+    if (i < buttons.length) {
+        const btn = buttons[i];
+        btn.className = test.passed ? "btn-testcase-pass" : "btn-testcase-fail";
+        btn.onclick = () => showTestCase(test.stderr, test.input, test.stdout, test.output, test.expected, btn, false);
+    }
+}
+
 //displays results of submission to user
 //i.e. "19/20 test cases passed"
-function displaySubmissionResults(results) {
+//summary holds the total runtime and its rank among passing submissions
+function displaySubmissionResults(results, summary = {}) {
     const testCaseStatus = document.getElementById('test-case-status');
 
     // Clear the right side
@@ -112,6 +235,17 @@ function displaySubmissionResults(results) {
         passMessage.textContent = `${passedCases}/${totalCases} Tests Passed`;
         leftDiv.appendChild(passMessage);
 
+        // "Runtime: n ms, faster than x%" text
+        if (summary.runtime !== null && summary.runtime !== undefined) {
+            const runtimeMessage = document.createElement('div');
+            runtimeMessage.style.fontFamily = "Inter, sans-serif";
+            runtimeMessage.textContent = `Runtime: ${summary.runtime} ms`;
+            if (summary.fasterThan !== null && summary.fasterThan !== undefined) {
+                runtimeMessage.textContent += `, faster than ${summary.fasterThan}% of ${summary.language} submissions`;
+            }
+            leftDiv.appendChild(runtimeMessage);
+        }
+
         // Right container
         const rightDiv = document.createElement('div');
 
@@ -142,6 +276,9 @@ function displaySubmissionResults(results) {
         failMessage.style.fontFamily = "Inter, sans-serif";
         failMessage.style.fontWeight = "600";
         failMessage.textContent = `${passedCases}/${totalCases} Tests Passed`;
+        // Fail-fast submissions skip the tests after the first failure
+        const notRunCases = results.filter(test => test.status === "not run").length;
+        if (notRunCases > 0) failMessage.textContent += ` (${notRunCases} not run)`;
         testCaseStatus.appendChild(failMessage);
     }
 }
@@ -190,6 +327,7 @@ async function analyzeTimeComplexity() {
     //Create payload
     const payload = {
         "code": code,
+        "language": document.getElementById("language-select").value.toLowerCase(),
         "question_description": questionDescription
     };
 
@@ -1,7 +1,9 @@
 """This module contains endpoints for DevReady"""
-from flask import Blueprint, render_template
+from flask import Blueprint, make_response, render_template, request
 from flask_login import login_required, current_user
-from .questions import get_next_question, get_all_tags_with_questions, get_all_completed_questions, get_acceptance_rate, has_passed_question
+from .catalog import (PRIVATE_CACHE_CONTROL, catalog_etag, catalog_version, not_modified,
+                      templates_fingerprint, with_validators)
+from .questions import get_next_question, get_all_tags_with_questions, get_all_completed_questions, get_acceptance_rate, has_passed_question, get_latest_passed_submission_id
 from .profile import get_solved_count, get_mastery_score, get_user_submissions, get_successful_submissions, get_language_count, get_recent_user_submissions
 
 # Create a blueprint
@@ -24,11 +26,24 @@ def main():
 @main_blueprint.route('/library', methods=['GET', 'POST'])
 @login_required
 def library():
-    """Endpoint to get problem library page."""
-    tag_questions = get_all_tags_with_questions()
+    """Endpoint to get problem library page.
+
+    The page shows the user's completed questions, so its ETag covers their latest passing
+    submission as well as the catalog version, and a GET already holding it gets a 304.
+    """
+    version = catalog_version()
+    etag = catalog_etag(version, "library", current_user.userID,
+                        get_latest_passed_submission_id(current_user.userID), templates_fingerprint())
+    if request.method == 'GET':
+        unchanged = not_modified(etag, PRIVATE_CACHE_CONTROL)
+        if unchanged is not None:
+            return unchanged
+
+    tag_questions = get_all_tags_with_questions(version)
     completed_questions = get_all_completed_questions(current_user.userID)
-    return render_template('library.html', user=current_user, tag_questions=tag_questions,
-                            completed_questions=completed_questions)
+    response = make_response(render_template('library.html', user=current_user, tag_questions=tag_questions,
+                                             completed_questions=completed_questions))
+    return with_validators(response, etag, PRIVATE_CACHE_CONTROL)
 
 @main_blueprint.route('/profile', methods=['GET', 'POST'])
 @login_required